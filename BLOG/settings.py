@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/4.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
+
 import os
 from pathlib import Path
 
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "personal_blog.file_server.FileServerMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -111,6 +113,34 @@ DATABASES = {
 #     }
 # }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # navigation, home widgets, template fragments and rendition widths
+        "OPTIONS": {"MAX_ENTRIES": 5_000},
+    },
+    # seen by every worker process, see VERSION_CACHE
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache", "shared"),
+        "TIMEOUT": None,
+    },
+    # see PAGE_CACHE
+    "pages": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache", "pages"),
+        "OPTIONS": {"MAX_ENTRIES": 10_000, "CULL_FREQUENCY": 4},
+    },
+    # one entry per post viewed since the last flush, see VIEW_COUNTER_CACHE
+    "view-counts": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "view-counts",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -147,6 +177,62 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATICFILES_DIRS = ("static",)
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles/")
+# hashed file names, theme bundles and .gz/.br siblings, built by
+# `manage.py build_assets` (see personal_blog/storage.py)
+STATICFILES_STORAGE = "personal_blog.storage.BundledStaticFilesStorage"
+
+# STATIC_ROOT and MEDIA_ROOT are served by personal_blog.file_server when
+# there is no web server in front to do it. Files without a hashed name are
+# cached for SERVE_FILES_MAX_AGE seconds, the hashed ones for a year.
+SERVE_FILES = not DEBUG
+SERVE_FILES_MAX_AGE = 60 * 60
+
+# {% bundle %} links the bundle, or its sources one by one with DEBUG on
+ASSET_BUNDLES = {
+    "aznews/assets/css/aznews.bundle.css": [
+        "aznews/assets/css/bootstrap.min.css",
+        "aznews/assets/css/owl.carousel.min.css",
+        "aznews/assets/css/ticker-style.css",
+        "aznews/assets/css/flaticon.css",
+        "aznews/assets/css/slicknav.css",
+        "aznews/assets/css/animate.min.css",
+        "aznews/assets/css/magnific-popup.css",
+        "aznews/assets/css/fontawesome-all.min.css",
+        "aznews/assets/css/themify-icons.css",
+        "aznews/assets/css/slick.css",
+        "aznews/assets/css/nice-select.css",
+        "aznews/assets/css/style.css",
+    ],
+    "aznews/assets/js/aznews.bundle.js": [
+        "aznews/assets/js/vendor/modernizr-3.5.0.min.js",
+        "aznews/assets/js/vendor/jquery-1.12.4.min.js",
+        "aznews/assets/js/popper.min.js",
+        "aznews/assets/js/bootstrap.min.js",
+        "aznews/assets/js/jquery.slicknav.min.js",
+        "aznews/assets/js/owl.carousel.min.js",
+        "aznews/assets/js/slick.min.js",
+        "aznews/assets/js/gijgo.min.js",
+        "aznews/assets/js/wow.min.js",
+        "aznews/assets/js/animated.headline.js",
+        "aznews/assets/js/jquery.magnific-popup.js",
+        "aznews/assets/js/jquery.ticker.js",
+        "aznews/assets/js/site.js",
+        "aznews/assets/js/jquery.scrollUp.min.js",
+        "aznews/assets/js/jquery.nice-select.min.js",
+        "aznews/assets/js/jquery.sticky.js",
+        "aznews/assets/js/contact.js",
+        "aznews/assets/js/jquery.form.js",
+        "aznews/assets/js/jquery.validate.min.js",
+        "aznews/assets/js/mail-script.js",
+        "aznews/assets/js/jquery.ajaxchimp.min.js",
+        "aznews/assets/js/plugins.js",
+        "aznews/assets/js/main.js",
+    ],
+}
+# collected files under these directories that no template or bundle
+# refers to are removed by build_assets
+ASSET_STRIP_DIRS = ["aznews/"]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
@@ -171,3 +257,52 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
 }
+
+# Post views are buffered in this cache and flushed to the database every
+# VIEW_COUNTER_FLUSH_INTERVAL seconds (see personal_blog/view_counter.py).
+# Its own cache, so the page and fragment caches never evict unflushed views.
+VIEW_COUNTER_CACHE = "view-counts"
+VIEW_COUNTER_FLUSH_INTERVAL = 30
+
+# The versions of the cached data (personal_blog/cache_versions.py), also
+# the ETag and Last-Modified of the pages. They must be the same in every
+# worker process, or a change seen by one worker is never seen by the others:
+# a cache shared between the processes (file, database, redis, memcached).
+VERSION_CACHE = "shared"
+
+# Sidebar/menu data from personal_blog.navigation_context_processor is cached
+# and invalidated whenever a post, category or tag changes
+NAVIGATION_CACHE_TIMEOUT = 60 * 15
+
+# PDF reports are rendered by `manage.py run_report_worker` and kept here
+REPORTS_ROOT = os.path.join(BASE_DIR, "reports/")
+# a running report job is handed to another worker after this many seconds
+REPORT_JOB_TIMEOUT = 60 * 10
+# a job that failed this many times stays failed until retried with
+# `manage.py run_report_worker --retry-failed`
+REPORT_JOB_MAX_ATTEMPTS = 3
+# `manage.py prune_reports` deletes the rendered reports and the finished
+# jobs older than this many days
+REPORT_RETENTION_DAYS = 30
+
+# Whole pages of the public blog views rendered for anonymous visitors
+# (see personal_blog/page_cache.py). Their own cache, shared by the workers,
+# so pages don't evict the navigation, widgets and fragments of "default".
+PAGE_CACHE = "pages"
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Route the read-mostly blog pages to personal_blog/async_views.py. Set by
+# BLOG/asgi.py; under WSGI the sync views are faster.
+ASYNC_VIEWS = os.environ.get("BLOG_ASYNC_VIEWS") == "1"
+
+# the home page widgets (personal_blog/widgets.py) are rebuilt when content
+# changes, and after this many seconds for the view counts they sort by
+HOME_WIDGETS_TIMEOUT = 60 * 5
+
+# `manage.py send_newsletter` (see personal_blog/newsletter.py) sends this many
+# messages per SMTP round, at most NEWSLETTER_RATE_LIMIT a second (0: no limit)
+NEWSLETTER_FROM_EMAIL = os.environ.get("NEWSLETTER_FROM_EMAIL", "webmaster@localhost")
+NEWSLETTER_BATCH_SIZE = 100
+NEWSLETTER_RATE_LIMIT = 10
+# links in the newsletter point here
+NEWSLETTER_SITE_URL = os.environ.get("NEWSLETTER_SITE_URL", "http://127.0.0.1:8000")
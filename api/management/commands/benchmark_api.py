@@ -0,0 +1,146 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import PostSerializer, UserRowSerializer, UserSerializer
+from personal_blog.models import Category, Post, Tag
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the serialization of the posts and users API responses: all "
+        "the posts, in full and with ?fields=, and all the users, with "
+        "UserSerializer and with the values() rows of UserRowSerializer. "
+        "Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--posts",
+            type=int,
+            default=10_000,
+            help="Number of posts, and of users, to serialize.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Times each serialization is run, the median is reported.",
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            # the hyperlinks are built for the test client's host
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options):
+        count = options["posts"]
+        self.add_posts(count)
+        self.add_users(count)
+
+        posts = (
+            Post.objects.filter(status="published")
+            .select_related("category", "author")
+            .prefetch_related("tag")
+        )
+        users = User.objects.order_by("-date_joined")
+        runs = {
+            "posts": lambda: PostSerializer(
+                posts.all(), many=True, context=self.context("/api/v1/posts/")
+            ).data,
+            "posts ?fields=": lambda: PostSerializer(
+                posts.defer("content"),
+                many=True,
+                context=self.context("/api/v1/posts/", fields="url,id,title"),
+            ).data,
+            "users": lambda: UserSerializer(
+                users.prefetch_related("groups"),
+                many=True,
+                context=self.context("/api/v1/users/"),
+            ).data,
+            "users rows": lambda: UserRowSerializer(
+                users.values(*UserRowSerializer.row_fields),
+                many=True,
+                context=self.context("/api/v1/users/"),
+            ).data,
+        }
+        self.stdout.write(
+            f"{'serializer':<16} {'rows':>8} {'queries':>8} {'ms':>9} {'rows/s':>9}"
+        )
+        for label, run in runs.items():
+            rows, queries, elapsed = self.time(run, options["repeat"])
+            self.stdout.write(
+                f"{label:<16} {rows:>8} {queries:>8} {elapsed * 1000:>9.1f} "
+                f"{rows / elapsed:>9.0f}"
+            )
+
+    def add_posts(self, count, batch_size=5000):
+        author = User.objects.create_user("benchmark")
+        categories = Category.objects.bulk_create(
+            Category(name=f"category {i}") for i in range(10)
+        )
+        tags = Tag.objects.bulk_create(Tag(name=f"tag {i}") for i in range(50))
+        now = timezone.now()
+        for start in range(0, count, batch_size):
+            posts = Post.objects.bulk_create(
+                Post(
+                    title=f"Post {i}",
+                    content="<p>lorem ipsum dolor sit amet</p>" * 50,
+                    featured_image="post_images/benchmark.jpg",
+                    category=categories[i % len(categories)],
+                    author=author,
+                    status="published",
+                    published_at=now - timedelta(minutes=i),
+                )
+                for i in range(start, min(count, start + batch_size))
+            )
+            # three tags per post
+            Post.tag.through.objects.bulk_create(
+                Post.tag.through(post_id=post.pk, tag_id=tags[(post.pk + j) % 50].pk)
+                for post in posts
+                for j in range(3)
+            )
+
+    def add_users(self, count, batch_size=5000):
+        groups = Group.objects.bulk_create(Group(name=f"group {i}") for i in range(5))
+        offset = User.objects.count()
+        for start in range(0, count, batch_size):
+            users = User.objects.bulk_create(
+                User(username=f"user{i}", email=f"user{i}@example.com", password="!")
+                for i in range(offset + start, offset + min(count, start + batch_size))
+            )
+            User.groups.through.objects.bulk_create(
+                User.groups.through(user_id=user.pk, group_id=groups[user.pk % 5].pk)
+                for user in users
+            )
+
+    def context(self, path, **params):
+        return {"request": Request(APIRequestFactory().get(path, params))}
+
+    def time(self, run, repeat):
+        """
+        The number of rows `run()` serializes, the queries it takes and the
+        median seconds it takes, queries included.
+        """
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                rows = len(run())
+                timings.append(time.perf_counter() - started)
+        return rows, len(queries), statistics.median(timings)
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PostCursorPagination(CursorPagination):
+    # newest first; posts published at the same time are told apart by the
+    # position within the page stored in the cursor
+    ordering = ("-published_at", "-pk")
+    page_size = 20
+
+
+class NameCursorPagination(CursorPagination):
+    ordering = ("name", "pk")
+    page_size = 50
@@ -1,5 +1,26 @@
+from collections import defaultdict
+
 from django.contrib.auth.models import User, Group
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from personal_blog.models import Category, Post, Tag
+
+
+class SparseFieldsMixin:
+    """
+    Only serialize the comma separated fields of the `?fields=` query
+    parameter, when given. Unknown fields are ignored.
+    """
+
+    def get_field_names(self, declared_fields, info):
+        field_names = super().get_field_names(declared_fields, info)
+        request = self.context.get("request")
+        requested = request and request.query_params.get("fields")
+        if requested:
+            requested = set(requested.split(","))
+            field_names = [name for name in field_names if name in requested]
+        return field_names
 
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
@@ -12,3 +33,115 @@ class GroupSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Group
         fields = ["url", "name"]
+
+
+URL_PLACEHOLDER = "__pk__"
+
+
+class RowSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer of the `row_fields` values() rows, for list
+    responses where a ModelSerializer per object is too slow. Hyperlinks are
+    reversed once per response and filled in with the primary key.
+    """
+
+    row_fields = ("pk",)
+
+    def link(self, view_name, pk):
+        templates = self.__dict__.setdefault("_link_templates", {})
+        if view_name not in templates:
+            templates[view_name] = reverse(
+                view_name,
+                kwargs={"pk": URL_PLACEHOLDER},
+                request=self.context.get("request"),
+                format=self.context.get("format"),
+            )
+        return templates[view_name].replace(URL_PLACEHOLDER, str(pk))
+
+
+class UserRowListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        rows = list(data)
+        # the group ids of the whole page in one query
+        memberships = (
+            User.groups.through.objects.filter(user__in=[row["pk"] for row in rows])
+            .order_by("pk")
+            .values_list("user_id", "group_id")
+        )
+        self.child.group_ids = defaultdict(list)
+        for user_id, group_id in memberships:
+            self.child.group_ids[user_id].append(group_id)
+        return super().to_representation(rows)
+
+
+class UserRowSerializer(RowSerializer):
+    """UserSerializer's output from values() rows, only with many=True."""
+
+    row_fields = ("pk", "username", "email")
+
+    class Meta:
+        list_serializer_class = UserRowListSerializer
+
+    def to_representation(self, row):
+        return {
+            "url": self.link("user-detail", row["pk"]),
+            "username": row["username"],
+            "email": row["email"],
+            "groups": [
+                self.link("group-detail", pk) for pk in self.group_ids[row["pk"]]
+            ],
+        }
+
+
+class GroupRowSerializer(RowSerializer):
+    """GroupSerializer's output from values() rows."""
+
+    row_fields = ("pk", "name")
+
+    def to_representation(self, row):
+        return {"url": self.link("group-detail", row["pk"]), "name": row["name"]}
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = Category
+        fields = ["url", "id", "name", "total_views"]
+        extra_kwargs = {"url": {"view_name": "api-category-detail"}}
+
+
+class TagSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ["url", "id", "name"]
+        extra_kwargs = {"url": {"view_name": "api-tag-detail"}}
+
+
+class PostSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    tags = serializers.HyperlinkedRelatedField(
+        source="tag", many=True, read_only=True, view_name="api-tag-detail"
+    )
+    author = serializers.CharField(source="author.username", read_only=True)
+
+    class Meta:
+        model = Post
+        fields = [
+            "url",
+            "id",
+            "title",
+            "category",
+            "category_name",
+            "tags",
+            "author",
+            "featured_image",
+            "image_width",
+            "image_height",
+            "published_at",
+            "updated_at",
+            "views_count",
+            "content",
+        ]
+        extra_kwargs = {
+            "url": {"view_name": "api-post-detail"},
+            "category": {"view_name": "api-category-detail"},
+        }
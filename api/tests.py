@@ -1,3 +1,54 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+
+from api.pagination import PostCursorPagination
+from personal_blog.tests import BlogTestCase
+
+
+class APIQueryCountTests(BlogTestCase):
+    """The API takes the same number of queries whatever the page size."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        groups = [Group.objects.create(name=f"group{i}") for i in range(6)]
+        for i in range(6):
+            user = User.objects.create_user(f"user{i}")
+            user.groups.set(groups[: i % 3 + 1])
+        # authenticated without the session queries
+        self.client.force_authenticate(User.objects.get(username="user0"))
+
+    def assertListQueries(self, num, url, pagination):
+        for page_size in (2, 5):
+            with self.subTest(url=url, page_size=page_size):
+                with mock.patch.object(pagination, "page_size", page_size):
+                    with self.assertNumQueries(num):
+                        response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()["results"]), page_size)
+
+    def test_user_list(self):
+        # the count, the page of users and the groups of those users
+        self.assertListQueries(3, "/api/v1/users/", PageNumberPagination)
+        self.assertListQueries(2, "/api/v1/groups/", PageNumberPagination)
+
+    def test_user_detail(self):
+        user = User.objects.get(username="user2")
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/v1/users/{user.pk}/")
+        self.assertEqual(len(response.json()["groups"]), 3)
+
+    def test_post_list(self):
+        for i in range(6):
+            self.create_post(tags=i % 4 + 1)
+        # the page of posts with their category and author, and their tags
+        self.assertListQueries(2, "/api/v1/posts/", PostCursorPagination)
+
+    def test_post_detail(self):
+        post = self.create_post(tags=3)
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/v1/posts/{post.pk}/")
+        self.assertEqual(len(response.json()["tags"]), 3)
@@ -5,6 +5,10 @@ from api import viewsets
 router = routers.DefaultRouter()
 router.register(r"users", viewsets.UserViewSet)
 router.register(r"groups", viewsets.GroupViewSet)
+# prefixed, the blog pages already use post-detail, tag-detail, etc.
+router.register(r"posts", viewsets.PostViewSet, basename="api-post")
+router.register(r"categories", viewsets.CategoryViewSet, basename="api-category")
+router.register(r"tags", viewsets.TagViewSet, basename="api-tag")
 
 # Wire up our API using automatic URL routing.
 # Additionally, we include login URLs for the browsable API.
@@ -1,25 +1,142 @@
 from django.contrib.auth.models import Group, User
+from django.utils.dateparse import parse_date
 from rest_framework import permissions, viewsets
+from rest_framework.exceptions import ValidationError
 
-from api.serializers import GroupSerializer, UserSerializer
+from api.pagination import NameCursorPagination, PostCursorPagination
+from api.serializers import (
+    CategorySerializer,
+    GroupRowSerializer,
+    GroupSerializer,
+    PostSerializer,
+    TagSerializer,
+    UserRowSerializer,
+    UserSerializer,
+)
+from personal_blog.conditional import ConditionalGetMixin
+from personal_blog.models import Category, Post, Tag
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class RowListMixin:
+    """
+    Serve GET list responses from values() rows serialized by
+    `row_serializer_class`, which must produce what `serializer_class`
+    would. Everything else uses model instances and `serializer_class`.
+    """
+
+    row_serializer_class = None
+
+    def is_row_list(self):
+        # the browsable API renders its POST form through a cloned request
+        return self.action == "list" and self.request.method in ("GET", "HEAD")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_row_list():
+            return queryset.prefetch_related(None).values(
+                *self.row_serializer_class.row_fields
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.is_row_list():
+            return self.row_serializer_class
+        return super().get_serializer_class()
+
+
+class UserViewSet(ConditionalGetMixin, RowListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
     """
 
-    queryset = User.objects.all().order_by("-date_joined")
+    queryset = User.objects.prefetch_related("groups").order_by("-date_joined")
     serializer_class = UserSerializer
+    row_serializer_class = UserRowSerializer
     # permission_classes = [permissions.IsAuthenticated]
     permission_classes = [permissions.AllowAny]
+    version_namespaces = ("api",)
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(ConditionalGetMixin, RowListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows groups to be viewed or edited.
     """
 
-    queryset = Group.objects.all()
+    queryset = Group.objects.order_by("name")
     serializer_class = GroupSerializer
+    row_serializer_class = GroupRowSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_namespaces = ("api",)
+
+
+class PostViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Published posts, newest first. Filter with `?category=<id>`,
+    `?tag=<id>`, `?published_after=` and `?published_before=` (YYYY-MM-DD),
+    pick fields with `?fields=title,url`.
+    """
+
+    serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
+    permission_classes = [permissions.AllowAny]
+    # views_count changes with every flush of the view counts
+    version_namespaces = ("pages", "views")
+
+    def get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        date = parse_date(value)
+        if date is None:
+            raise ValidationError({name: "Enter a date as YYYY-MM-DD."})
+        return date
+
+    def get_id_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        if not (value.isascii() and value.isdigit()):
+            raise ValidationError({name: "Enter a numeric id."})
+        return int(value)
+
+    def get_queryset(self):
+        params = self.request.query_params
+        posts = (
+            Post.objects.filter(status="published", published_at__isnull=False)
+            .select_related("category", "author")
+            .prefetch_related("tag")
+        )
+        category = self.get_id_param("category")
+        if category:
+            posts = posts.filter(category=category)
+        tag = self.get_id_param("tag")
+        if tag:
+            posts = posts.filter(tag=tag)
+        published_after = self.get_date_param("published_after")
+        if published_after:
+            posts = posts.filter(published_at__date__gte=published_after)
+        published_before = self.get_date_param("published_before")
+        if published_before:
+            posts = posts.filter(published_at__date__lte=published_before)
+
+        fields = params.get("fields")
+        if fields and "content" not in fields.split(","):
+            # the largest column by far
+            posts = posts.defer("content")
+        return posts
+
+
+class CategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Category.objects.all()
+    serializer_class = CategorySerializer
+    pagination_class = NameCursorPagination
+    permission_classes = [permissions.AllowAny]
+    # total_views changes with every flush of the view counts
+    version_namespaces = ("pages", "views")
+
+
+class TagViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Tag.objects.all()
+    serializer_class = TagSerializer
+    pagination_class = NameCursorPagination
+    permission_classes = [permissions.AllowAny]
@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from personal_blog.models import Category, Comment, Contact, NewsLetter, Post, Tag
+from personal_blog.models import (
+    Category,
+    Comment,
+    Contact,
+    NewsLetter,
+    NewsletterIssue,
+    Post,
+    Tag,
+)
 
 # admin.site.register(Post)
 admin.site.register(Comment)
@@ -15,3 +23,11 @@ class PostAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Post, PostAdmin)
+
+
+class NewsletterIssueAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "sent_count", "created_at", "finished_at")
+    list_filter = ("status",)
+
+
+admin.site.register(NewsletterIssue, NewsletterIssueAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PersonalBlogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "personal_blog"
+
+    def ready(self):
+        from personal_blog import signals  # noqa: F401
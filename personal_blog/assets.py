@@ -0,0 +1,89 @@
+import gzip
+import re
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover
+    rjsmin = None
+
+# Theme bundles: settings.ASSET_BUNDLES maps a bundle name to the static
+# files it concatenates, in order. A bundle is written next to its sources,
+# so the relative url()s in the stylesheets still resolve.
+
+CSS_IMPORT_RE = re.compile(r"@import\s+(?:url\()?[^;]*;", re.IGNORECASE)
+CSS_COMMENT_RE = re.compile(r"/\*(?!!).*?\*/", re.DOTALL)
+
+# text formats worth storing a compressed sibling of
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".xml", ".map", ".ttf", ".eot")
+MIN_COMPRESS_SIZE = 512
+
+
+def bundle_sources(name):
+    return settings.ASSET_BUNDLES[name]
+
+
+def minify_css(css):
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+    # no minifier installed: only drop comments and blank lines
+    css = CSS_COMMENT_RE.sub("", css)
+    return "\n".join(line.strip() for line in css.splitlines() if line.strip())
+
+
+def minify_js(js):
+    if rjsmin is not None:
+        return rjsmin.jsmin(js)
+    return js
+
+
+def concat_css(contents):
+    """
+    Concatenate and minify stylesheets. @import rules are only valid at the
+    top of a stylesheet, so they are moved to the top of the bundle.
+    """
+    imports = []
+
+    def hoist(match):
+        imports.append(match.group(0))
+        return ""
+
+    body = "\n".join(CSS_IMPORT_RE.sub(hoist, css) for css in contents)
+    return "\n".join(imports + [minify_css(body)])
+
+
+def concat_js(contents):
+    # a leading ; ends a previous file missing its last semicolon
+    return "\n".join(";" + minify_js(js) for js in contents)
+
+
+def build_bundle(name, read):
+    """The content of the bundle `name`, reading its sources with read(path)."""
+    contents = [read(source) for source in bundle_sources(name)]
+    if name.endswith(".css"):
+        return concat_css(contents)
+    if name.endswith(".js"):
+        return concat_js(contents)
+    raise ValueError(f"Cannot bundle {name}, only .css and .js bundles are supported")
+
+
+def compressed_siblings(name, data):
+    """The (name, content) of the pre-compressed copies of the file `name`."""
+    if not name.endswith(COMPRESSIBLE) or len(data) < MIN_COMPRESS_SIZE:
+        return []
+    siblings = [(f"{name}.gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        siblings.append((f"{name}.br", brotli.compress(data)))
+    # not worth it when it barely shrinks the file
+    return [(n, c) for n, c in siblings if len(c) < len(data) * 0.9]
@@ -0,0 +1,212 @@
+import asyncio
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.paginator import InvalidPage
+from django.db.models import QuerySet
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.views.generic import View
+
+from personal_blog import search, view_counter, views, widgets
+from personal_blog.cache_versions import aget_version
+from personal_blog.conditional import aconditional_response, page_validators
+from personal_blog.models import Post
+from personal_blog.navigation_context_processor import anavigation
+from personal_blog.page_cache import (
+    cacheable_page,
+    cached_page_response,
+    page_cache_key,
+)
+from personal_blog.pagination import (
+    InvalidCursor,
+    KeysetPaginator,
+    OffsetCursorPaginator,
+)
+
+# Async versions of the read-mostly views of personal_blog/views.py, served
+# instead of them when settings.ASYNC_VIEWS is set (BLOG/asgi.py sets it).
+# Queries go through the async ORM API and the independent ones are awaited
+# together. Templates are still rendered in a thread, as they may query
+# through lazy relations.
+
+
+class AsyncConditionalView(View):
+    """
+    ConditionalGetMixin for async views. Subclasses implement
+    get_context_data() as a coroutine.
+    """
+
+    template_name = None
+
+    def view_skipped(self):
+        """Called (in a thread) when the page is answered without the view."""
+
+    async def get_context_data(self, **kwargs):
+        return {"view": self}
+
+    async def get(self, request, *args, **kwargs):
+        context, navigation = await asyncio.gather(
+            self.get_context_data(**kwargs), anavigation()
+        )
+        return TemplateResponse(request, self.template_name, {**navigation, **context})
+
+    async def get_page(self, request, *args, **kwargs):
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await super().dispatch(request, *args, **kwargs)
+        validators, last_modified = await sync_to_async(page_validators)(request)
+        response = await aconditional_response(
+            request,
+            validators,
+            last_modified,
+            partial(self.get_page, request, *args, **kwargs),
+        )
+        if response.status_code == 304:
+            await sync_to_async(self.view_skipped)()
+        return response
+
+
+class AsyncPageCacheView(AsyncConditionalView):
+    """PageCacheMixin for async views."""
+
+    page_cache_timeout = None
+
+    async def get_page(self, request, *args, **kwargs):
+        if await sync_to_async(lambda: request.user.is_authenticated)():
+            return await super().get_page(request, *args, **kwargs)
+
+        cache = caches[settings.PAGE_CACHE]
+        key = page_cache_key(request, await aget_version("pages"))
+        cached = await cache.aget(key)
+        if cached is not None:
+            await sync_to_async(self.view_skipped)()
+            return cached_page_response(request, cached)
+
+        response = await super().get_page(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            await sync_to_async(response.render)()
+        cached = cacheable_page(response)
+        if cached is not None:
+            await cache.aset(
+                key,
+                cached,
+                timeout=self.page_cache_timeout or settings.PAGE_CACHE_TIMEOUT,
+            )
+        return response
+
+
+class HomePageView(AsyncPageCacheView):
+    template_name = views.HomePageView.template_name
+
+    async def get_context_data(self, **kwargs):
+        context = await super().get_context_data(**kwargs)
+        context.update(await sync_to_async(widgets.home_widgets)())
+        return context
+
+
+class PostDetailView(AsyncPageCacheView):
+    template_name = views.PostDetailView.template_name
+
+    def view_skipped(self):
+        view_counter.record_view(self.kwargs["pk"])
+
+    async def get_context_data(self, **kwargs):
+        context = await super().get_context_data(**kwargs)
+        pk = kwargs["pk"]
+        try:
+            post = await views.PostDetailView.queryset.aget(pk=pk)
+        except Post.DoesNotExist:
+            raise Http404("No post found matching the query")
+        # buffered, written to the database in batches by view_counter.flush
+        await sync_to_async(view_counter.record_view)(pk)
+
+        published_posts = Post.objects.filter(status="published")
+        context["previous_post"], context["next_post"] = await asyncio.gather(
+            published_posts.filter(id__lt=pk).order_by("-id").afirst(),
+            published_posts.filter(id__gt=pk).order_by("id").afirst(),
+        )
+        context["post"] = context["object"] = post
+        return context
+
+
+class PostListView(AsyncPageCacheView):
+    template_name = views.PostListView.template_name
+    paginate_by = views.PostListView.paginate_by
+    cursor_kwarg = "cursor"
+
+    def get_queryset(self):
+        return views.PostListView.queryset.all()
+
+    async def get_context_data(self, **kwargs):
+        context = await super().get_context_data(**kwargs)
+        paginator = KeysetPaginator(self.get_queryset(), self.paginate_by)
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        try:
+            page = await sync_to_async(paginator.page)(cursor)
+        except InvalidPage as e:
+            raise Http404(str(e))
+        context.update(
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=page.has_other_pages(),
+            object_list=page.object_list,
+            posts=page.object_list,
+        )
+        return context
+
+
+class PostByTag(PostListView):
+    template_name = views.PostByTag.template_name
+    paginate_by = views.PostByTag.paginate_by
+
+    def get_queryset(self):
+        return (
+            Post.objects.filter(
+                status="published",
+                published_at__isnull=False,
+                tag=self.kwargs["tag_id"],
+            )
+            .for_listing()
+            .order_by("-published_at")
+        )
+
+
+class PostByCategory(PostListView):
+    template_name = views.PostByCategory.template_name
+    paginate_by = views.PostByCategory.paginate_by
+
+    def get_queryset(self):
+        return (
+            Post.objects.filter(
+                status="published",
+                published_at__isnull=False,
+                category=self.kwargs["cat_id"],
+            )
+            .for_listing()
+            .order_by("-published_at")
+        )
+
+
+class PostSearchView(AsyncConditionalView):
+    template_name = views.PostSearchView.template_name
+
+    async def get_context_data(self, **kwargs):
+        context = await super().get_context_data(**kwargs)
+        query = self.request.GET.get("query", "")
+        # relevance ranked, see personal_blog/search.py
+        post_list = await sync_to_async(search.search_posts)(query)
+        if isinstance(post_list, QuerySet):
+            paginator = KeysetPaginator(post_list, views.PAGINATE_BY)
+        else:
+            paginator = OffsetCursorPaginator(post_list, views.PAGINATE_BY)
+        try:
+            posts = await sync_to_async(paginator.page)(self.request.GET.get("cursor"))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        context.update(page_obj=posts, query=query)
+        return context
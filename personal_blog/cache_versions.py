@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Cached data is stored under keys that include a version number per
+# namespace. Bumping the version (see personal_blog/signals.py) invalidates
+# every key of that namespace at once without having to know the keys. The
+# versions are kept in settings.VERSION_CACHE, which every process shares.
+VERSION_KEY = "cache-version:{}"
+
+
+def _cache():
+    return caches[settings.VERSION_CACHE]
+
+
+def get_version(namespace):
+    return _cache().get_or_set(VERSION_KEY.format(namespace), time.time(), timeout=None)
+
+
+async def aget_version(namespace):
+    return await _cache().aget_or_set(
+        VERSION_KEY.format(namespace), time.time(), timeout=None
+    )
+
+
+def bump_version(*namespaces):
+    now = time.time()
+    _cache().set_many(
+        {VERSION_KEY.format(namespace): now for namespace in namespaces},
+        timeout=None,
+    )
@@ -0,0 +1,108 @@
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from personal_blog.cache_versions import get_version
+
+
+def check_conditions(request, validators, last_modified):
+    """
+    The ETag and Last-Modified of a response described by `validators`
+    (anything whose repr() changes when the response would) and
+    `last_modified` (a timestamp), and the 304 Not Modified to answer with
+    when the client's copy still matches, else None.
+    """
+    digest = hashlib.md5(repr(validators).encode()).hexdigest()
+    etag = f'W/"{digest}"'
+    last_modified = int(last_modified)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return etag, last_modified, response
+
+
+def add_validators(response, etag, last_modified):
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        # revalidated on every request, so neither changes nor post views
+        # are missed
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, validators, last_modified, get_response):
+    """
+    Answer with 304 Not Modified when the client's copy still matches, else
+    call get_response() and add an ETag and Last-Modified to it. Both
+    `validators` and `last_modified` must be cheap to compute.
+    """
+    etag, last_modified, response = check_conditions(request, validators, last_modified)
+    if response is None:
+        response = add_validators(get_response(), etag, last_modified)
+    return response
+
+
+async def aconditional_response(request, validators, last_modified, get_response):
+    """conditional_response() with an async get_response()."""
+    etag, last_modified, response = check_conditions(request, validators, last_modified)
+    if response is None:
+        response = add_validators(await get_response(), etag, last_modified)
+    return response
+
+
+def page_validators(request, namespaces=("pages",)):
+    """
+    The validators of a response that changes with the cache versions of
+    `namespaces`, and its last modification time: the latest of them.
+    """
+    versions = tuple(get_version(namespace) for namespace in namespaces)
+    validators = (
+        versions,
+        request.get_full_path(),
+        request.user.pk,
+        # a new CSRF cookie makes the token in the page invalid
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        # the API negotiates the format and authenticates on these
+        request.headers.get("Accept"),
+        request.headers.get("Authorization"),
+    )
+    return validators, max(versions)
+
+
+class ConditionalGetMixin:
+    """
+    Answer conditional GETs with 304 Not Modified without running the view,
+    for the blog pages and the API viewsets alike. The response is
+    considered changed when one of the `version_namespaces` cache versions
+    is: personal_blog/signals.py bumps "pages" whenever a post, comment,
+    category or tag changes, api/signals.py bumps "api" for users and
+    groups, and personal_blog/view_counter.py bumps "views" when it writes
+    view counts.
+    """
+
+    version_namespaces = ("pages",)
+
+    def view_skipped(self):
+        """Called when the page is answered without running the view."""
+
+    def get_validators(self):
+        return page_validators(self.request, self.version_namespaces)
+
+    def get_page(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        validators, last_modified = self.get_validators()
+        response = conditional_response(
+            request,
+            validators,
+            last_modified,
+            partial(self.get_page, request, *args, **kwargs),
+        )
+        if response.status_code == 304:
+            self.view_skipped()
+        return response
@@ -0,0 +1,211 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+# Serves STATIC_ROOT and MEDIA_ROOT from the top of the middleware stack, for
+# deployments without a web server in front. Responses are FileResponses of
+# the open file: gunicorn (and any server providing wsgi.file_wrapper with
+# sendfile) passes them to os.sendfile() without copying them through Python.
+
+# hashed names written by personal_blog.storage.BundledStaticFilesStorage
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+BLOCK_SIZE = 64 * 1024
+
+
+class FileSlice:
+    """
+    `length` bytes of an open file from `start`. The file position is moved
+    to `start`, so a sendfile() from the current position by the server
+    sends the slice too (when it is told the Content-Length).
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    The (start, end) bytes of a single "Range: bytes=..." header, None to
+    send the whole file (no, multiple or malformed ranges), or "unsatisfiable".
+    """
+    match = RANGE_RE.match(header or "")
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # the last N bytes
+        return (max(0, size - int(last)), size - 1) if int(last) else "unsatisfiable"
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        return "unsatisfiable" if start >= size else None
+    return start, end
+
+
+def parse_accept_encoding(header):
+    """
+    The {coding: q-value} of an Accept-Encoding header, lowercased. Codings
+    with a malformed q-value get 0, as if refused.
+    """
+    accepted = {}
+    for item in (header or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+                if not 0 <= q <= 1:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def find_file(root, name, accept_encoding, ranged):
+    """
+    The (path, stat, encoding, compressed) of the file to send for `name`:
+    its .br or .gz sibling the client prefers in its Accept-Encoding header
+    (br on a tie), unless only a range was asked for. `compressed` tells
+    whether it has such siblings at all.
+    """
+    try:
+        path = safe_join(root, name)
+        st = os.stat(path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    accepted = parse_accept_encoding(accept_encoding)
+    compressed = False
+    best, best_q = (path, st, None), 0
+    for encoding, ext in ENCODINGS:
+        try:
+            sibling = os.stat(path + ext)
+        except OSError:
+            continue
+        compressed = True
+        q = accepted.get(encoding, accepted.get("*", 0))
+        if not ranged and q > best_q:
+            best, best_q = (path + ext, sibling, encoding), q
+    return (*best, compressed)
+
+
+def serve(request, root, name, cache_control):
+    ranged = "HTTP_RANGE" in request.META
+    found = find_file(root, name, request.META.get("HTTP_ACCEPT_ENCODING", ""), ranged)
+    if found is None:
+        return None
+    path, st, encoding, compressed = found
+    etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(st.st_mtime)
+    )
+    if response is None:
+        size = st.st_size
+        byte_range = None
+        if_range = request.META.get("HTTP_IF_RANGE")
+        if ranged and (
+            if_range is None
+            or if_range == etag
+            or parse_http_date_safe(if_range) == int(st.st_mtime)
+        ):
+            byte_range = parse_range(request.META["HTTP_RANGE"], size)
+        if byte_range == "unsatisfiable":
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        status = 206 if byte_range else 200
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if request.method == "HEAD":
+            response = HttpResponse(status=status, content_type=content_type)
+        else:
+            response = FileResponse(
+                FileSlice(open(path, "rb"), start, end - start + 1),
+                status=status,
+                content_type=content_type,
+            )
+            response.block_size = BLOCK_SIZE
+        response.headers["Content-Length"] = end - start + 1
+        if byte_range:
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(st.st_mtime)
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["Cache-Control"] = cache_control
+    if compressed:
+        response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+class FileServerMiddleware:
+    """
+    Answer GET and HEAD requests under STATIC_URL and MEDIA_URL with the
+    files in STATIC_ROOT and MEDIA_ROOT, before any other middleware runs.
+    Requests for missing files go through to the URLconf. Enabled by
+    settings.SERVE_FILES, off with DEBUG where runserver serves them.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVE_FILES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.mounts = [
+            (settings.STATIC_URL, settings.STATIC_ROOT),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT),
+        ]
+
+    def cache_control(self, prefix, name):
+        if prefix == settings.STATIC_URL and FINGERPRINT_RE.search(name):
+            return IMMUTABLE
+        return f"public, max-age={settings.SERVE_FILES_MAX_AGE}"
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD"):
+            for prefix, root in self.mounts:
+                if root and request.path_info.startswith(prefix):
+                    name = request.path_info[len(prefix) :]
+                    response = serve(
+                        request, root, name, self.cache_control(prefix, name)
+                    )
+                    if response is not None:
+                        return response
+        return self.get_response(request)
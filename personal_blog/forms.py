@@ -37,10 +37,12 @@ class ContactForm(forms.ModelForm):
         fields = "__all__"
 
 
-class NewsLetterForm(forms.ModelForm):
-    class Meta:
-        model = NewsLetter
-        fields = "__all__"
+class NewsLetterForm(forms.Form):
+    # not a ModelForm, subscribing an email twice is not an error
+    email = forms.EmailField(max_length=254)
+
+    def clean_email(self):
+        return NewsLetter.normalize_email(self.cleaned_data["email"])
 
 
 class CommentForm(forms.ModelForm):
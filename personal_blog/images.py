@@ -0,0 +1,137 @@
+import os
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, UnidentifiedImageError
+
+# Smaller copies ("renditions") of the uploaded featured images, stored next
+# to the original as post_images/%Y/%m/%d/<name>-<rendition>.jpg and .webp.
+# They are generated when a post is saved (personal_blog/signals.py) or on
+# first use by the {% post_image %} template tag.
+RENDITIONS = {
+    # name: maximum width in pixels
+    "thumbnail": 180,
+    "card": 400,
+    "hero": 1200,
+}
+FORMATS = {
+    # extension: (Pillow format, save options)
+    "jpg": ("JPEG", {"quality": 80, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", {"quality": 75, "method": 4}),
+}
+
+
+def rendition_name(name, rendition, ext):
+    root, _ = os.path.splitext(name)
+    return f"{root}-{rendition}.{ext}"
+
+
+def _cache_key(name):
+    return f"rendition-widths:{name}"
+
+
+def generate_renditions(image):
+    """
+    Write every rendition of the ImageField file `image`. Returns the
+    width of each rendition, which is the original width when the original
+    is narrower than the rendition.
+    """
+    storage = image.storage
+    with storage.open(image.name, "rb") as f:
+        original = Image.open(f)
+        original.load()
+
+    widths = {}
+    for rendition, width in RENDITIONS.items():
+        resized = original.copy()
+        # keeps the aspect ratio and never enlarges
+        resized.thumbnail((width, width * 10), Image.LANCZOS)
+        widths[rendition] = resized.width
+        for ext, (image_format, options) in FORMATS.items():
+            converted = resized
+            if image_format == "JPEG" and resized.mode != "RGB":
+                converted = Image.new("RGB", resized.size, (255, 255, 255))
+                if "A" in resized.getbands():
+                    converted.paste(resized, mask=resized.getchannel("A"))
+                else:
+                    converted.paste(resized.convert("RGB"))
+            buffer = BytesIO()
+            converted.save(buffer, image_format, **options)
+
+            name = rendition_name(image.name, rendition, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+    widths["original"] = original.width
+    cache.set(_cache_key(image.name), widths, timeout=None)
+    return widths
+
+
+def read_widths(image):
+    """The widths of the existing renditions of `image`, from their headers."""
+    widths = {}
+    for rendition in RENDITIONS:
+        with image.storage.open(rendition_name(image.name, rendition, "jpg")) as f:
+            widths[rendition] = Image.open(f).width
+    with image.storage.open(image.name, "rb") as f:
+        widths["original"] = Image.open(f).width
+    return widths
+
+
+def ensure_renditions(image):
+    """
+    Generate the renditions of `image` unless they exist. Returns the width
+    of each rendition and of the "original", or an empty dict when the image
+    can't be read, in which case the original should be served.
+    """
+    if not image:
+        return {}
+    key = _cache_key(image.name)
+    widths = cache.get(key)
+    if widths is None:
+        storage = image.storage
+        available = all(
+            storage.exists(rendition_name(image.name, rendition, ext))
+            for rendition in RENDITIONS
+            for ext in FORMATS
+        )
+        try:
+            widths = read_widths(image) if available else generate_renditions(image)
+        except (OSError, UnidentifiedImageError):
+            widths = {}
+        # retry unreadable images now and then
+        cache.set(key, widths, timeout=None if widths else 60 * 5)
+    return widths
+
+
+def rendition_url(image, rendition, ext="jpg"):
+    return image.storage.url(rendition_name(image.name, rendition, ext))
+
+
+def image_metadata(path):
+    """
+    Width, height, byte size and dominant colour ("#rrggbb") of the image
+    file at `path`. Doesn't touch Django, so it can run in a worker process.
+    Returns None when the file is missing; width, height and colour are None
+    when it isn't a readable image.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    metadata = {"width": None, "height": None, "size": size, "color": None}
+    try:
+        with Image.open(path) as im:
+            metadata["width"], metadata["height"] = im.size
+            # let the JPEG decoder downscale while decoding
+            im.draft("RGB", (64, 64))
+            small = im.convert("RGB")
+            small.thumbnail((64, 64))
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return metadata
+    palette_image = small.quantize(colors=8)
+    _, index = max(palette_image.getcolors())
+    r, g, b = palette_image.getpalette()[index * 3 : index * 3 + 3]
+    metadata["color"] = f"#{r:02x}{g:02x}{b:02x}"
+    return metadata
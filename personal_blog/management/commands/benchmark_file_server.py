@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.views import static
+
+from personal_blog import file_server
+
+# To compare the file server with the ones of a deployment, e.g. nginx, run
+# load_test against both with --path of a static file.
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the requests per second and the bytes per second that "
+        "personal_blog.file_server and django.views.static.serve, which "
+        "static() routes to, answer for files of several sizes, reading the "
+        "responses in the process as a WSGI server without sendfile would."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1_000, 100_000, 10_000_000],
+            help="Sizes in bytes of the files to request.",
+        )
+        parser.add_argument(
+            "-d",
+            "--duration",
+            type=float,
+            default=2,
+            help="Seconds to request each file with each server.",
+        )
+
+    def handle(self, *args, **options):
+        root = tempfile.mkdtemp()
+        try:
+            self.benchmark(root, options)
+        finally:
+            shutil.rmtree(root)
+
+    def benchmark(self, root, options):
+        servers = {
+            "file_server": lambda request, name: file_server.serve(
+                request, root, name, "public"
+            ),
+            "static()": lambda request, name: static.serve(
+                request, name, document_root=root
+            ),
+        }
+        self.stdout.write(f"{'bytes':>10} {'server':<12} {'req/s':>9} {'MB/s':>9}")
+        for size in sorted(options["sizes"]):
+            name = f"file-{size}.bin"
+            with open(os.path.join(root, name), "wb") as f:
+                f.write(os.urandom(size))
+            for label, serve in servers.items():
+                requests = self.run(serve, name, options["duration"])
+                self.stdout.write(
+                    f"{size:>10} {label:<12} {requests:>9.0f} "
+                    f"{requests * size / 2**20:>9.1f}"
+                )
+
+    def run(self, serve, name, duration):
+        """Requests per second of `name` answered by `serve` for `duration`."""
+        request = RequestFactory().get(f"/static/{name}")
+        requests = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        while time.perf_counter() < deadline:
+            response = serve(request, name)
+            for _ in response.streaming_content:
+                pass
+            response.close()
+            requests += 1
+        return requests / (time.perf_counter() - started)
@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from personal_blog import search
+from personal_blog.models import Category, Post
+
+# a few words show up in most posts, the others in a handful
+COMMON_WORDS = ["django", "python", "blog", "web", "code", "news"]
+RARE_WORDS = [f"word{i}" for i in range(5000)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the first page of a search with the full text index and with "
+        "the icontains filter it replaces, at several numbers of posts. Runs "
+        "in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--posts",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000],
+            help="Numbers of posts to measure with.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Times each search is run, the median is reported.",
+        )
+        parser.add_argument("--page-size", type=int, default=10)
+
+    def handle(self, *args, **options):
+        if search.get_backend() is None:
+            raise CommandError(f"{connection.vendor} has no full text index.")
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options):
+        author = User.objects.create_user("benchmark")
+        category = Category.objects.create(name="benchmark")
+        rng = random.Random(0)
+        queries = {
+            "common word": COMMON_WORDS[0],
+            "rare word": RARE_WORDS[0],
+            "no match": "nothingmatches",
+        }
+        self.stdout.write(
+            f"{'posts':>8} {'query':<12} {'fts ms':>8} {'icontains ms':>13}"
+        )
+        for count in sorted(options["posts"]):
+            self.add_posts(count - Post.objects.count(), author, category, rng)
+            search.rebuild_index(Post.objects.all())
+            for label, query in queries.items():
+                fts = self.time(search.search_posts, query, options)
+                icontains = self.time(search.icontains_posts, query, options)
+                self.stdout.write(
+                    f"{count:>8} {label:<12} {fts:>8.2f} {icontains:>13.2f}"
+                )
+
+    def add_posts(self, count, author, category, rng, batch_size=5000):
+        now = timezone.now()
+        offset = Post.objects.count()
+        for start in range(0, count, batch_size):
+            posts = []
+            for i in range(offset + start, offset + min(count, start + batch_size)):
+                words = rng.sample(COMMON_WORDS, 2) + rng.sample(RARE_WORDS, 3)
+                words += ["lorem", "ipsum", "dolor", "sit", "amet"] * 20
+                rng.shuffle(words)
+                posts.append(
+                    Post(
+                        title=f"Post {i} {words[0]}",
+                        content=f"<p>{' '.join(words)}</p>",
+                        featured_image="post_images/benchmark.jpg",
+                        category=category,
+                        author=author,
+                        status="published",
+                        published_at=now - timedelta(minutes=i),
+                    )
+                )
+            Post.objects.bulk_create(posts)
+
+    def time(self, find, query, options):
+        """Median milliseconds to load the first page of `find(query)`."""
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            list(find(query)[: options["page_size"]])
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
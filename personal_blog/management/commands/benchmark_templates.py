@@ -0,0 +1,136 @@
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from personal_blog.models import Category, Comment, Post, Tag
+
+LOCMEM = "django.core.cache.backends.locmem.LocMemCache"
+
+
+def caches(fragments):
+    """Process-local caches, with the {% cache %} fragments cached or not."""
+    return {
+        "default": {"BACKEND": LOCMEM, "LOCATION": "default"},
+        "shared": {"BACKEND": LOCMEM, "LOCATION": "shared"},
+        "pages": {"BACKEND": LOCMEM, "LOCATION": "pages"},
+        "view-counts": {"BACKEND": LOCMEM, "LOCATION": "view-counts"},
+        "template_fragments": {
+            "BACKEND": (
+                LOCMEM if fragments else "django.core.cache.backends.dummy.DummyCache"
+            ),
+            "LOCATION": "template_fragments",
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the rendering of the home and post detail pages with the "
+        "{% cache %} fragments of the aznews templates cached, and rendered "
+        "on every request. The pages are requested by a logged in user, "
+        "which the page cache doesn't serve. Runs in a throwaway test "
+        "database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=40)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests of each page, the median time is reported.",
+        )
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=["testserver"],
+                CACHES=caches(fragments=True),
+                MEDIA_ROOT=media_root,
+                STATICFILES_STORAGE=(
+                    "django.contrib.staticfiles.storage.StaticFilesStorage"
+                ),
+                # no flush of the view counts in the middle of the timings
+                VIEW_COUNTER_FLUSH_INTERVAL=60 * 60,
+            ):
+                self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(media_root)
+
+    def benchmark(self, options):
+        post = self.add_posts(options["posts"])
+        pages = {
+            "home": reverse("home"),
+            "detail": reverse("post-detail", args=[post.pk]),
+        }
+        self.stdout.write(f"{'page':<8} {'cached ms':>10} {'uncached ms':>12}")
+        for label, url in pages.items():
+            timings = []
+            for fragments in (True, False):
+                with override_settings(CACHES=caches(fragments)):
+                    timings.append(self.time(url, options["requests"]))
+            self.stdout.write(f"{label:<8} {timings[0]:>10.2f} {timings[1]:>12.2f}")
+
+    def add_posts(self, count):
+        """Published posts sharing one image, returns one in the middle."""
+        author = User.objects.create_user("benchmark", password="benchmark")
+        categories = [Category.objects.create(name=f"category {i}") for i in range(5)]
+        tags = [Tag.objects.create(name=f"tag {i}") for i in range(10)]
+        data = io.BytesIO()
+        Image.new("RGB", (1200, 800), (200, 30, 30)).save(data, "PNG")
+        image = default_storage.save(os.path.join("post_images", "benchmark.png"), data)
+        now = timezone.now()
+        posts = []
+        for i in range(count):
+            post = Post.objects.create(
+                title=f"Post {i}",
+                content="<p>lorem ipsum dolor sit amet</p>" * 20,
+                featured_image=image,
+                category=categories[i % len(categories)],
+                author=author,
+                status="published",
+                published_at=now - timedelta(hours=i),
+                views_count=i * 7 % count,
+            )
+            post.tag.set(tags[i % 10 : i % 10 + 3])
+            for j in range(3):
+                Comment.objects.create(
+                    post=post,
+                    description=f"comment {j}",
+                    author_name="reader",
+                    author_email="reader@example.com",
+                )
+            posts.append(post)
+        return posts[count // 2]
+
+    def time(self, url, requests):
+        """Median milliseconds to render `url`, after a warming request."""
+        client = Client()
+        client.login(username="benchmark", password="benchmark")
+        client.get(url)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise CommandError(f"{url} answered {response.status_code}.")
+        return statistics.median(timings) * 1000
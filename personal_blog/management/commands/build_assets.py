@@ -0,0 +1,120 @@
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.template.utils import get_app_template_dirs
+
+STATIC_TAG_RE = re.compile(r"""{%\s*(?:static|bundle)\s+["']([^"']+)["']""")
+CSS_URL_RE = re.compile(r"""url\(\s*["']?([^"')]+?)["']?\s*\)""")
+
+
+def template_references():
+    """The static files named by a {% static %} or {% bundle %} tag."""
+    dirs = [Path(d) for engine in settings.TEMPLATES for d in engine["DIRS"]]
+    dirs += [Path(d) for d in get_app_template_dirs("templates")]
+    names = set()
+    for directory in dirs:
+        for path in directory.rglob("*.html"):
+            names.update(STATIC_TAG_RE.findall(path.read_text(errors="ignore")))
+    return names
+
+
+def css_references(name, css):
+    for url in CSS_URL_RE.findall(css):
+        if re.match(r"^[a-z]+:|^//|^#", url):
+            continue
+        url = url.split("#")[0].split("?")[0]
+        if url.startswith(settings.STATIC_URL):
+            yield url[len(settings.STATIC_URL) :]
+        elif not url.startswith("/"):
+            yield posixpath.normpath(posixpath.join(posixpath.dirname(name), url))
+
+
+def size(path):
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+class Command(BaseCommand):
+    help = (
+        "Collect the static files into STATIC_ROOT with the bundles of "
+        "settings.ASSET_BUNDLES, hashed names and pre-compressed siblings, "
+        "then remove the collected theme files (settings.ASSET_STRIP_DIRS) "
+        "that neither a template nor a stylesheet refers to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the files of the previous build from STATIC_ROOT first.",
+        )
+        parser.add_argument(
+            "--keep-unused",
+            action="store_true",
+            help="Keep the theme files nothing refers to.",
+        )
+
+    def handle(self, *args, **options):
+        call_command(
+            "collectstatic",
+            interactive=False,
+            clear=options["clear"],
+            verbosity=max(0, options["verbosity"] - 1),
+        )
+        collected = size(settings.STATIC_ROOT)
+        source_sizes = {
+            name: sum(staticfiles_storage.size(source) for source in sources)
+            for name, sources in settings.ASSET_BUNDLES.items()
+        }
+        if not options["keep_unused"]:
+            self.strip_unused()
+
+        for name, sources in source_sizes.items():
+            hashed = staticfiles_storage.stored_name(name)
+            sizes = [f"{hashed} {staticfiles_storage.size(hashed)} bytes"]
+            for ext in (".gz", ".br"):
+                if staticfiles_storage.exists(hashed + ext):
+                    sizes.append(f"{ext} {staticfiles_storage.size(hashed + ext)}")
+            self.stdout.write(
+                f"{name}: {len(settings.ASSET_BUNDLES[name])} files, "
+                f"{sources} bytes -> {', '.join(sizes)}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {settings.STATIC_ROOT}: {collected / 2**20:.1f} MB collected, "
+                f"{size(settings.STATIC_ROOT) / 2**20:.1f} MB kept."
+            )
+        )
+
+    def strip_unused(self):
+        storage = staticfiles_storage
+        manifest = storage.load_manifest()
+
+        # everything the templates link, and what their stylesheets link
+        used = set()
+        pending = list(template_references())
+        while pending:
+            name = pending.pop()
+            if name in used or name not in manifest:
+                continue
+            used.add(name)
+            if name.endswith(".css"):
+                with storage.open(name) as f:
+                    pending.extend(css_references(name, f.read().decode()))
+
+        removed = 0
+        for name in list(manifest):
+            if name in used or not name.startswith(tuple(settings.ASSET_STRIP_DIRS)):
+                continue
+            for stored in {name, manifest.pop(name)}:
+                for path in (stored, f"{stored}.gz", f"{stored}.br"):
+                    if storage.exists(path):
+                        storage.delete(path)
+            removed += 1
+        storage.hashed_files = manifest
+        storage.save_manifest()
+        self.stdout.write(f"Removed {removed} unused theme files.")
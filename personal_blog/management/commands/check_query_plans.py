@@ -0,0 +1,127 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from personal_blog.models import Category, Post, Tag
+
+# EXPLAIN output that means "reads every row of the table"
+FULL_SCAN_PATTERNS = {
+    "sqlite": r"^SCAN {table}$",
+    "postgresql": r"Seq Scan on {table}\b",
+    "mysql": r"\b{table} \S+ ALL\b",
+}
+
+# nothing is served from a cache, so every query a page can run is checked
+DUMMY_CACHE = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+
+
+def page_urls():
+    """The public blog pages, with the first post, category and tag."""
+    urls = [reverse("home"), reverse("post-list"), reverse("about")]
+    post = Post.objects.filter(status="published").first()
+    if post is not None:
+        urls.append(reverse("post-detail", args=[post.pk]))
+        word = (re.findall(r"\w+", post.title) or ["a"])[0]
+        urls.append(f"{reverse('post-search')}?query={word}")
+    category = Category.objects.first()
+    if category is not None:
+        urls.append(reverse("post-by-category", args=[category.pk]))
+    tag = Tag.objects.first()
+    if tag is not None:
+        urls.append(reverse("post-by-tag", args=[tag.pk]))
+    return urls
+
+
+def full_scan_pattern(tables):
+    """A regex matching the plan lines reading all the rows of `tables`."""
+    return re.compile(
+        "|".join(
+            FULL_SCAN_PATTERNS[connection.vendor].format(table=re.escape(table))
+            for table in tables
+        )
+    )
+
+
+def explain(sql):
+    """The lines of the query plan of `sql`."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN {sql}")
+        return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the public blog pages with the caches off, EXPLAIN every "
+        "query they run and fail if any of them reads a whole table instead "
+        "of using an index, or if a page does not answer 200."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            action="append",
+            dest="tables",
+            help="Table that must not be fully scanned (default: the post table).",
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the plan of every query, not only the failing ones.",
+        )
+
+    def get_urls(self):
+        return page_urls()
+
+    def handle(self, *args, **options):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(f"Query plans of {connection.vendor} are not supported.")
+        tables = options["tables"] or [Post._meta.db_table]
+        full_scan = full_scan_pattern(tables)
+
+        caches = {
+            **settings.CACHES,
+            "default": DUMMY_CACHE,
+            settings.PAGE_CACHE: DUMMY_CACHE,
+        }
+        with override_settings(CACHES=caches):
+            failures, errors = self.check_pages(full_scan, options["verbose_plans"])
+
+        if errors:
+            raise CommandError(f"{errors} pages did not answer 200.")
+        if failures:
+            raise CommandError(f"{failures} queries scan a whole table.")
+        self.stdout.write(self.style.SUCCESS("Every query uses an index."))
+
+    def check_pages(self, full_scan, verbose_plans):
+        client = Client(HTTP_HOST="localhost")
+        failures = errors = 0
+        for url in self.get_urls():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            if response.status_code != 200:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f"{url} ({response.status_code})"))
+                continue
+            self.stdout.write(f"{url} ({response.status_code})")
+
+            for query in queries.captured_queries:
+                sql = query["sql"]
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                plan = explain(sql)
+                scans = [line for line in plan if full_scan.search(line.strip())]
+                if scans:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"  full scan: {sql}"))
+                if scans or verbose_plans:
+                    for line in plan:
+                        self.stdout.write(f"    {line}")
+        return failures, errors
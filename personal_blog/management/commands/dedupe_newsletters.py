@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from personal_blog.models import NewsLetter
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge the newsletter subscriptions of the same email, compared "
+        "case-insensitively, keeping the oldest, and normalize the emails."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            deleted, updated = NewsLetter.objects.merge_duplicates()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} duplicate subscriptions, normalized {updated} emails."
+            )
+        )
@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from personal_blog.images import image_metadata
+from personal_blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Record the width, height, byte size and dominant colour of the post "
+        "featured images. Only posts without metadata are processed unless "
+        "--all is given, so an interrupted run continues where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of posts to read and update per query.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Process every post, also the ones with metadata.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        posts = Post.objects.exclude(featured_image="")
+        if not options["all"]:
+            posts = posts.filter(image_size__isnull=True)
+        posts = (
+            posts.order_by("pk")
+            .only("pk", "featured_image")
+            .iterator(chunk_size=batch_size)
+        )
+
+        processed = missing = 0
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                batch = list(islice(posts, batch_size))
+                if not batch:
+                    break
+                paths = [post.featured_image.path for post in batch]
+                chunksize = max(1, len(batch) // (options["workers"] * 4))
+
+                updated = []
+                for post, metadata in zip(
+                    batch, executor.map(image_metadata, paths, chunksize=chunksize)
+                ):
+                    if metadata is None:
+                        missing += 1
+                        self.stderr.write(f"Missing image of post {post.pk}.")
+                        continue
+                    post.image_width = metadata["width"]
+                    post.image_height = metadata["height"]
+                    post.image_size = metadata["size"]
+                    post.image_color = metadata["color"] or ""
+                    updated.append(post)
+                Post.objects.bulk_update(
+                    updated,
+                    ["image_width", "image_height", "image_size", "image_color"],
+                )
+
+                processed += len(batch)
+                rate = processed / (time.monotonic() - started)
+                self.stdout.write(f"{processed} images, {rate:.1f} images/sec")
+
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} images ({missing} missing) "
+                f"in {elapsed:.1f}s, {rate:.1f} images/sec."
+            )
+        )
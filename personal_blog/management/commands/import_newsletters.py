@@ -0,0 +1,78 @@
+import csv
+import sys
+import time
+from itertools import chain
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+
+from personal_blog.models import NewsLetter
+from personal_blog.newsletter import batches
+
+
+class Command(BaseCommand):
+    help = (
+        'Add the emails of a CSV file (an "email" column, or else the first '
+        "column) to the newsletter subscribers. Emails already subscribed are "
+        "skipped, so importing a file twice is harmless."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='CSV file to import, "-" for stdin.')
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of subscribers inserted per query.",
+        )
+
+    def emails(self, rows):
+        header = next(rows, None)
+        if header is None:
+            return
+        names = [name.strip().lower() for name in header]
+        if "email" in names:
+            column = names.index("email")
+        else:
+            # no header, the first row is an email too
+            column = 0
+            rows = chain([header], rows)
+        for row in rows:
+            if len(row) > column:
+                yield row[column]
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            file = sys.stdin if path == "-" else open(path, newline="")
+        except OSError as e:
+            raise CommandError(e)
+
+        started = time.monotonic()
+        count_before = NewsLetter.objects.count()
+        read = invalid = 0
+        with file:
+            for emails in batches(self.emails(csv.reader(file)), options["batch_size"]):
+                subscribers = {}
+                for email in emails:
+                    email = NewsLetter.normalize_email(email)
+                    try:
+                        validate_email(email)
+                    except ValidationError:
+                        invalid += 1
+                        continue
+                    subscribers[email] = NewsLetter(email=email)
+                NewsLetter.objects.bulk_create(
+                    subscribers.values(), ignore_conflicts=True
+                )
+                read += len(emails)
+
+        added = NewsLetter.objects.count() - count_before
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {read} emails: {added} subscribed, {invalid} invalid, "
+                f"{read - invalid - added} already subscribed, "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,126 @@
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from personal_blog.management.commands.check_query_plans import page_urls
+
+# To compare the WSGI and ASGI deployments on the same database:
+#
+#   gunicorn BLOG.wsgi -w 4 -b 127.0.0.1:8001
+#   gunicorn BLOG.asgi -w 4 -b 127.0.0.1:8002 -k uvicorn.workers.UvicornWorker
+#   python manage.py load_test http://127.0.0.1:8001 http://127.0.0.1:8002
+
+
+def percentile(latencies, fraction):
+    """`latencies` must be sorted."""
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the public blog pages from running servers for a while with "
+        "concurrent clients and print the requests per second and the p50 "
+        "and p99 latency of each server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("servers", nargs="+", help="Base url of a server.")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Page to request (default: the pages check_query_plans checks).",
+        )
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Number of clients sending requests at the same time.",
+        )
+        parser.add_argument(
+            "-d",
+            "--duration",
+            type=float,
+            default=10,
+            help="Seconds to send requests to each server.",
+        )
+        parser.add_argument(
+            "--cookie",
+            help=(
+                'Cookie header to send, e.g. "sessionid=..." to measure the '
+                "rendering of the pages, which are not cached for users."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or page_urls()
+        headers = {"Cookie": options["cookie"]} if options["cookie"] else {}
+        self.stdout.write(
+            f"{len(paths)} pages, {options['concurrency']} clients, "
+            f"{options['duration']:g}s per server"
+        )
+        self.stdout.write(
+            f"{'server':<32} {'requests':>8} {'errors':>6} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p99 ms':>8}"
+        )
+        for server in options["servers"]:
+            urls = [server.rstrip("/") + path for path in paths]
+            # a round of every page first, so caches and workers are warm
+            for url in urls:
+                self.fetch(url, headers)
+            latencies, errors, elapsed = self.run(
+                urls, headers, options["concurrency"], options["duration"]
+            )
+            if not latencies:
+                raise CommandError(f"{server} answered no request.")
+            latencies.sort()
+            self.stdout.write(
+                f"{server:<32} {len(latencies):>8} {errors:>6} "
+                f"{len(latencies) / elapsed:>8.1f} "
+                f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.1f}"
+            )
+
+    def fetch(self, url, headers):
+        """Request `url`, returns whether it answered 200."""
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def run(self, urls, headers, concurrency, duration):
+        """
+        Request `urls` in turn from `concurrency` threads for `duration`
+        seconds. Returns the latencies of the successful requests, the
+        number of failed ones and the time taken.
+        """
+        deadline = time.monotonic() + duration
+
+        def client(offset):
+            latencies, errors = [], 0
+            i = offset
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                if self.fetch(urls[i % len(urls)], headers):
+                    latencies.append(time.monotonic() - started)
+                else:
+                    errors += 1
+                i += 1
+            return latencies, errors
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(client, range(concurrency)))
+        elapsed = time.monotonic() - started
+        return (
+            [latency for latencies, _ in results for latency in latencies],
+            sum(errors for _, errors in results),
+            elapsed,
+        )
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from personal_blog import trending
+
+
+class Command(BaseCommand):
+    help = "Delete the hourly post view buckets older than the trending windows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=trending.WINDOWS["week"].days,
+            help="Keep the buckets of this many days (default: one week).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of buckets to delete per query.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = trending.prune(
+            keep=timedelta(days=options["keep_days"]),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} view buckets."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from personal_blog import search
+from personal_blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full text search index of the published posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of posts to index per query.",
+        )
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild_index(
+            Post.objects.all(), batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} posts."))
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from personal_blog import newsletter
+
+
+class Command(BaseCommand):
+    help = (
+        "Send a digest of the posts published since the previous issue to the "
+        "newsletter subscribers. An issue that was interrupted is resumed "
+        "where it stopped instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subject", help="Subject of a new issue.")
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="List the posts published during the last DAYS days "
+            "(default: since the previous issue).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Messages sent per round (default: NEWSLETTER_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            help="Maximum messages per second, 0 for no limit "
+            "(default: NEWSLETTER_RATE_LIMIT).",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["days"]:
+            since = timezone.now() - timedelta(days=options["days"])
+
+        issue = newsletter.next_issue(subject=options["subject"], since=since)
+        if issue is None:
+            self.stdout.write("No posts published since the previous issue.")
+            return
+        if issue.sent_count:
+            self.stdout.write(
+                f"Resuming {issue} after {issue.sent_count} sent ({issue.last_email})."
+            )
+
+        def progress(issue, rate):
+            self.stdout.write(f"{issue.sent_count} sent, {rate:.1f} messages/sec")
+
+        sent = newsletter.send_issue(
+            issue,
+            batch_size=options["batch_size"],
+            rate=options["rate"],
+            progress=progress if options["verbosity"] > 1 else None,
+        )
+        if issue.failed_emails:
+            self.stderr.write(
+                f"{len(issue.failed_emails)} addresses were refused: "
+                f"{', '.join(issue.failed_emails)}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sent {issue} to {sent} subscribers ({issue.sent_count} in total)."
+            )
+        )
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.1 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_total_views(apps, schema_editor):
+    Category = apps.get_model("personal_blog", "Category")
+    Post = apps.get_model("personal_blog", "Post")
+    views = (
+        Post.objects.filter(
+            category=OuterRef("pk"), status="published", published_at__isnull=False
+        )
+        .order_by()
+        .values("category")
+        .annotate(total=Sum("views_count"))
+        .values("total")
+    )
+    Category.objects.update(total_views=Coalesce(Subquery(views), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0004_contact_created_at_contact_updated_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="contact",
+            options={"ordering": ("-created_at",)},
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="total_views",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["-total_views"], name="category_total_views_idx"
+            ),
+        ),
+        migrations.RunPython(fill_total_views, migrations.RunPython.noop),
+    ]
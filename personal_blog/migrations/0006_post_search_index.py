@@ -0,0 +1,70 @@
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# The full text index of personal_blog/search.py as of this migration, the
+# DDL and the backfill are inlined so later changes to search.py and to
+# Post don't change what this migration does.
+TABLE_NAME = "personal_blog_post_search"
+
+INSTALL = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} "
+        "USING fts5(title, content, tokenize = 'porter unicode61')",
+    ],
+    "postgresql": [
+        f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ("
+        "post_id bigint PRIMARY KEY "
+        "REFERENCES personal_blog_post (id) ON DELETE CASCADE "
+        "DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS {TABLE_NAME}_document_idx "
+        f"ON {TABLE_NAME} USING gin (document)",
+    ],
+}
+
+INSERT = {
+    "sqlite": f"INSERT INTO {TABLE_NAME} (rowid, title, content) VALUES (%s, %s, %s)",
+    "postgresql": (
+        f"INSERT INTO {TABLE_NAME} (post_id, document) VALUES (%s, "
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B'))"
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in INSTALL:
+        return
+    Post = apps.get_model("personal_blog", "Post")
+    rows = (
+        Post.objects.using(schema_editor.connection.alias)
+        .filter(status="published")
+        .values_list("pk", "title", "content")
+        .iterator(chunk_size=500)
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for statement in INSTALL[vendor]:
+            cursor.execute(statement)
+        cursor.executemany(
+            INSERT[vendor],
+            [(pk, title, strip_tags(content)) for pk, title, content in rows],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in INSTALL:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0005_category_total_views"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-18 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0008_post_image_metadata"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["updated_at", "id"], name="comment_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["updated_at", "id"], name="post_updated_idx"),
+        ),
+    ]
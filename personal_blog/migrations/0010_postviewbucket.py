@@ -0,0 +1,44 @@
+# Generated by Django 4.1.1 on 2026-10-18 07:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0009_export_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostViewBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField()),
+                ("views", models.PositiveIntegerField(default=0)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="personal_blog.post",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="postviewbucket",
+            constraint=models.UniqueConstraint(
+                fields=("hour", "post"), name="postviewbucket_hour_post_uniq"
+            ),
+        ),
+    ]
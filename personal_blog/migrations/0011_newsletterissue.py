@@ -0,0 +1,45 @@
+# Generated by Django 4.1.1 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0010_postviewbucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NewsletterIssue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("subject", models.CharField(max_length=256)),
+                ("since", models.DateTimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("sending", "sending"), ("sent", "sent")],
+                        default="sending",
+                        max_length=20,
+                    ),
+                ),
+                ("last_email", models.CharField(blank=True, max_length=254)),
+                ("sent_count", models.PositiveIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.1 on 2026-10-18 08:09
+
+from django.db import migrations, models
+from django.db.models import F, Min
+from django.db.models.functions import Lower, Trim
+
+
+def merge_duplicate_subscribers(apps, schema_editor):
+    # NewsLetterQuerySet.merge_duplicates() as of this migration
+    NewsLetter = apps.get_model("personal_blog", "NewsLetter")
+    normalized = Lower(Trim("email"))
+    first_ids = (
+        NewsLetter.objects.annotate(normalized=normalized)
+        .order_by()
+        .values("normalized")
+        .annotate(first_id=Min("pk"))
+        .values("first_id")
+    )
+    # selected first, MySQL can't delete from a table the DELETE subqueries
+    duplicate_ids = list(
+        NewsLetter.objects.exclude(pk__in=first_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    for start in range(0, len(duplicate_ids), 1000):
+        NewsLetter.objects.filter(pk__in=duplicate_ids[start : start + 1000]).delete()
+    NewsLetter.objects.annotate(normalized=normalized).exclude(
+        email=F("normalized")
+    ).update(email=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0011_newsletterissue"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_subscribers, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="newsletter",
+            name="email",
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["-created_at"], name="contact_created_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.1 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("personal_blog", "0012_unique_newsletter_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsletterissue",
+            name="failed_emails",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
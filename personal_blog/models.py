@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, F, Min, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce, Lower, Trim
 
 
 class TimeStampModel(models.Model):
@@ -9,8 +11,33 @@ class TimeStampModel(models.Model):
         abstract = True  # does not create table for TimeStampModel
 
 
+class CategoryQuerySet(models.QuerySet):
+    def top_by_views(self, n):
+        # total_views is kept up to date by personal_blog.view_counter.flush
+        return self.order_by("-total_views", "pk")[:n]
+
+    def refresh_total_views(self):
+        # recount from scratch in a single UPDATE ... SET = (SELECT SUM(...))
+        views = (
+            Post.objects.filter(
+                category=OuterRef("pk"),
+                status="published",
+                published_at__isnull=False,
+            )
+            .order_by()
+            .values("category")
+            .annotate(total=Sum("views_count"))
+            .values("total")
+        )
+        return self.update(total_views=Coalesce(Subquery(views), 0))
+
+
 class Category(TimeStampModel):
     name = models.CharField(max_length=20)
+    # sum of views_count of the published posts in this category
+    total_views = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = CategoryQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -18,6 +45,9 @@ class Category(TimeStampModel):
     class Meta:
         verbose_name = "Category"
         verbose_name_plural = "Categories"
+        indexes = [
+            models.Index(fields=["-total_views"], name="category_total_views_idx"),
+        ]
 
 
 class Tag(TimeStampModel):
@@ -27,6 +57,22 @@ class Tag(TimeStampModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    def for_listing(self):
+        # everything the post cards render, in a constant number of queries
+        return (
+            self.select_related("category", "author")
+            .prefetch_related("tag")
+            .annotate(comment_count=Count("comments"))
+        )
+
+    def with_comments(self):
+        # fills the cache used by Post.latest_comments
+        return self.prefetch_related(
+            Prefetch("comments", queryset=Comment.objects.order_by("-created_at"))
+        )
+
+
 # ORM => Object relational mapping => sql
 class Post(TimeStampModel):
     STATUS_CHOICES = [
@@ -47,23 +93,156 @@ class Post(TimeStampModel):
         max_length=20, choices=STATUS_CHOICES, default="unpublished"
     )
     views_count = models.PositiveBigIntegerField(default=0)
+    # featured_image metadata, filled by the extract_image_metadata command
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_size = models.PositiveBigIntegerField(null=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            # listings, newest first (keyset pagination continues on id)
+            models.Index(
+                fields=["status", "published_at", "id"],
+                name="post_status_published_idx",
+            ),
+            # trending widgets
+            models.Index(
+                fields=["status", "views_count"], name="post_status_views_idx"
+            ),
+            # recent posts in the navigation
+            models.Index(
+                fields=["status", "created_at"], name="post_status_created_idx"
+            ),
+            # post by category listing
+            models.Index(
+                fields=["category", "status", "published_at", "id"],
+                name="post_category_published_idx",
+            ),
+            # incremental exports (report/exporters.py)
+            models.Index(fields=["updated_at", "id"], name="post_updated_idx"),
+        ]
+
     # Fat models
     @property
     def latest_comments(self):
-        comments = Comment.objects.filter(post=self).order_by("-created_at")
-        return comments
+        if "comments" in getattr(self, "_prefetched_objects_cache", {}):
+            # already ordered by Post.objects.with_comments()
+            return self.comments.all()
+        return self.comments.order_by("-created_at")
+
+
+class PostViewBucket(models.Model):
+    """
+    Views of a post during one hour, written by view_counter.flush. Trending
+    posts are summed from these instead of from the whole post table, and
+    `manage.py prune_view_buckets` deletes the old ones.
+    """
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+")
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.post_id} @ {self.hour:%Y-%m-%d %H:00}: {self.views}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "post"], name="postviewbucket_hour_post_uniq"
+            ),
+        ]
+
+
+class NewsLetterQuerySet(models.QuerySet):
+    def subscribe(self, email):
+        """The (subscriber, created) of `email`, added unless already there."""
+        return self.get_or_create(email=NewsLetter.normalize_email(email))
+
+    def merge_duplicates(self, batch_size=1000):
+        """
+        Keep the first subscription of every email, compared normalized, and
+        normalize the emails kept. Returns the number of rows deleted and
+        updated.
+        """
+        normalized = Lower(Trim("email"))
+        first_ids = (
+            self.annotate(normalized=normalized)
+            .order_by()
+            .values("normalized")
+            .annotate(first_id=Min("pk"))
+            .values("first_id")
+        )
+        # selected first, MySQL can't delete from a table the DELETE subqueries
+        duplicate_ids = list(
+            self.exclude(pk__in=first_ids).order_by("pk").values_list("pk", flat=True)
+        )
+        deleted = 0
+        for start in range(0, len(duplicate_ids), batch_size):
+            count, _ = self.filter(
+                pk__in=duplicate_ids[start : start + batch_size]
+            ).delete()
+            deleted += count
+        updated = (
+            self.annotate(normalized=normalized)
+            .exclude(email=F("normalized"))
+            .update(email=normalized)
+        )
+        return deleted, updated
 
 
 class NewsLetter(TimeStampModel):
-    email = models.EmailField()
+    # stored normalized, see normalize_email()
+    email = models.EmailField(unique=True)
+
+    objects = NewsLetterQuerySet.as_manager()
 
     def __str__(self):
         return self.email
 
+    @staticmethod
+    def normalize_email(email):
+        return email.strip().lower()
+
+    def clean(self):
+        # before validate_unique(), so forms find the normalized duplicates
+        self.email = self.normalize_email(self.email)
+
+    def save(self, *args, **kwargs):
+        self.email = self.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
+
+class NewsletterIssue(TimeStampModel):
+    """
+    A digest sent to the NewsLetter subscribers by `manage.py send_newsletter`.
+    Subscribers are sent to in order of their email, and `last_email` records
+    the last one sent to, so an interrupted issue is resumed from there.
+    """
+
+    STATUS_CHOICES = [
+        ("sending", "sending"),
+        ("sent", "sent"),
+    ]
+
+    subject = models.CharField(max_length=256)
+    # the digest lists the posts published from this date on
+    since = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="sending")
+    last_email = models.CharField(max_length=254, blank=True)
+    sent_count = models.PositiveIntegerField(default=0)
+    # addresses the mail server refused
+    failed_emails = models.JSONField(default=list, blank=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
 
 class Contact(TimeStampModel):
     message = models.TextField()
@@ -76,6 +255,9 @@ class Contact(TimeStampModel):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["-created_at"], name="contact_created_idx"),
+        ]
 
 
 class Comment(TimeStampModel):
@@ -87,6 +269,12 @@ class Comment(TimeStampModel):
     def __str__(self):
         return self.description[:100]
 
+    class Meta:
+        indexes = [
+            # incremental exports (report/exporters.py)
+            models.Index(fields=["updated_at", "id"], name="comment_updated_idx"),
+        ]
+
 
 ################## Relationship in database
 # 1 - 1
@@ -1,40 +1,86 @@
-from django.db.models import Case, F, Sum, When
+import asyncio
+from functools import partial
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.functional import SimpleLazyObject
+
+from personal_blog.cache_versions import aget_version, get_version
 from personal_blog.models import Category, Post, Tag
 
 
-def navigation(request):
-    categories = Category.objects.all()
-    tags = Tag.objects.all()[:10]
-    recent_posts = Post.objects.filter(
-        status="published", published_at__isnull=False
-    ).order_by("-created_at")[:5]
-    # Get the post with the highest views_count by summing views_count of all posts in each category
-    top_categories = (
+def get_categories():
+    return list(Category.objects.all())
+
+
+def get_tags():
+    return list(Tag.objects.all()[:10])
+
+
+def get_recent_posts():
+    return list(
         Post.objects.filter(status="published", published_at__isnull=False)
-        .values("category__pk", "category__name")
-        .annotate(
-            pk=F("category__pk"), name=F("category__name"), max_views=Sum("views_count")
-        )
-        .order_by("-views_count")
-        .values("pk", "name", "max_views")
+        .select_related("category")
+        .order_by("-created_at")[:5]
     )
-    category_ids = [top_category["pk"] for top_category in top_categories]  # [2,6,5,6]
-    order_by_max_views = Case(
-        *[
-            When(
-                id=category["pk"], then=category["max_views"]
-            )  # When(id=2, then=11), When(id=6,then=2)
-            for category in top_categories
-        ]
+
+
+def get_top_categories():
+    return list(Category.objects.annotate(post_count=Count("post")).top_by_views(4))
+
+
+def cached(name, compute):
+    """
+    Lazily load `name` from the cache, computing it on a miss. Nothing is
+    evaluated until a template actually uses the value.
+    """
+
+    def load():
+        key = f"navigation:{name}:{get_version('navigation')}"
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, settings.NAVIGATION_CACHE_TIMEOUT)
+        return value
+
+    return SimpleLazyObject(load)
+
+
+NAVIGATION = {
+    "categories": get_categories,
+    "tags": get_tags,
+    "recent_posts": get_recent_posts,
+    "top_categories": get_top_categories,
+}
+
+
+def navigation(request):
+    context = {name: cached(name, compute) for name, compute in NAVIGATION.items()}
+    # for the {% cache %} keys of the fragments rendering the values above
+    context["navigation_version"] = SimpleLazyObject(partial(get_version, "navigation"))
+    return context
+
+
+async def acached(name, compute):
+    """cached() for async views, loaded right away."""
+    key = f"navigation:{name}:{await aget_version('navigation')}"
+    value = await cache.aget(key)
+    if value is None:
+        value = await sync_to_async(compute)()
+        await cache.aset(key, value, settings.NAVIGATION_CACHE_TIMEOUT)
+    return value
+
+
+async def anavigation():
+    """
+    The navigation() values for async views, all loaded concurrently, so
+    the templates don't query from the lazy context processor values.
+    """
+    values = await asyncio.gather(
+        *(acached(name, compute) for name, compute in NAVIGATION.items())
     )
-    # top categories by views_count
-    top_categories = Category.objects.filter(pk__in=category_ids).order_by(
-        -order_by_max_views
-    )[:4]
-    return {
-        "categories": categories,
-        "tags": tags,
-        "recent_posts": recent_posts,
-        "top_categories": top_categories,
-    }
+    context = dict(zip(NAVIGATION, values))
+    context["navigation_version"] = await aget_version("navigation")
+    return context
@@ -0,0 +1,142 @@
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from personal_blog.models import NewsLetter, NewsletterIssue, Post
+
+# the first issue lists the posts of the last week
+FIRST_ISSUE_PERIOD = timedelta(days=7)
+
+
+def digest_posts(since):
+    return list(
+        Post.objects.filter(status="published", published_at__gte=since)
+        .select_related("category")
+        .order_by("-published_at")
+    )
+
+
+def render_digest(issue, posts):
+    """The text and HTML bodies of the issue, the same for every subscriber."""
+    context = {
+        "issue": issue,
+        "posts": [
+            (
+                post,
+                settings.NEWSLETTER_SITE_URL + reverse("post-detail", args=[post.pk]),
+            )
+            for post in posts
+        ],
+        "site_url": settings.NEWSLETTER_SITE_URL,
+    }
+    return (
+        render_to_string("newsletter/digest.txt", context),
+        render_to_string("newsletter/digest.html", context),
+    )
+
+
+def subscribers(after="", chunk_size=2000):
+    """
+    The subscriber emails after `after`, in order. They are stored
+    normalized and unique, so this is a scan of the unique index.
+    """
+    return (
+        NewsLetter.objects.filter(email__gt=after)
+        .order_by("email")
+        .values_list("email", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def send_issue(issue, batch_size=None, rate=None, connection=None, progress=None):
+    """
+    Send `issue` to the subscribers it was not sent to yet, one message per
+    subscriber over a single connection, at most `rate` messages per second.
+    Addresses the server refuses are recorded in `issue.failed_emails` and
+    skipped. The progress is saved every `batch_size` subscribers and when
+    sending fails, so a rerun continues after the last one handled.
+    """
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    rate = settings.NEWSLETTER_RATE_LIMIT if rate is None else rate
+    text, html = render_digest(issue, digest_posts(issue.since))
+    connection = connection or get_connection()
+
+    def save_progress():
+        issue.save(
+            update_fields=["last_email", "sent_count", "failed_emails", "updated_at"]
+        )
+
+    started = time.monotonic()
+    sent = 0
+    with connection:
+        for emails in batches(subscribers(issue.last_email), batch_size):
+            try:
+                for email in emails:
+                    message = EmailMultiAlternatives(
+                        issue.subject,
+                        text,
+                        settings.NEWSLETTER_FROM_EMAIL,
+                        [email],
+                        connection=connection,
+                    )
+                    message.attach_alternative(html, "text/html")
+                    try:
+                        connection.send_messages([message])
+                    except smtplib.SMTPRecipientsRefused:
+                        # permanent, sending again would fail the same way
+                        issue.failed_emails.append(email)
+                    else:
+                        sent += 1
+                        issue.sent_count += 1
+                    issue.last_email = email
+            finally:
+                save_progress()
+            if progress is not None:
+                progress(issue, sent / (time.monotonic() - started))
+            if rate:
+                # wait until the average rate is back under the limit
+                delay = sent / rate - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+    issue.status = "sent"
+    issue.finished_at = timezone.now()
+    issue.save(update_fields=["status", "finished_at", "updated_at"])
+    return sent
+
+
+def next_issue(subject=None, since=None):
+    """
+    The issue still being sent, or a new one for the posts published since
+    `since` (by default, since the previous issue). None when there is
+    nothing new to send.
+    """
+    issue = NewsletterIssue.objects.filter(status="sending").order_by("pk").first()
+    if issue is not None:
+        return issue
+    if since is None:
+        previous = NewsletterIssue.objects.filter(status="sent").order_by("-pk").first()
+        since = previous.created_at if previous else timezone.now() - FIRST_ISSUE_PERIOD
+    if not Post.objects.filter(status="published", published_at__gte=since).exists():
+        return None
+    return NewsletterIssue.objects.create(
+        subject=subject or f"What's new since {timezone.localtime(since):%B %d}",
+        since=since,
+    )
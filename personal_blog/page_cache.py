@@ -0,0 +1,74 @@
+import hashlib
+import re
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from personal_blog.cache_versions import get_version
+from personal_blog.conditional import ConditionalGetMixin
+
+# The footer's newsletter form puts a CSRF token on every page. It is stored
+# as a placeholder and replaced with the token of whoever gets the page.
+CSRF_TOKEN_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_TOKEN_PLACEHOLDER = "__page_cache_csrf_token__"
+
+
+def page_cache_key(request, version):
+    params = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = f"{request.build_absolute_uri(request.path)}?{params}"
+    return f"page:{version}:{hashlib.md5(url.encode()).hexdigest()}"
+
+
+def cached_page_response(request, cached):
+    content, content_type = cached
+    return HttpResponse(
+        content.replace(CSRF_TOKEN_PLACEHOLDER, get_token(request)),
+        content_type=content_type,
+    )
+
+
+def cacheable_page(response):
+    """What to cache of a rendered response, None if it can't be cached."""
+    if response.status_code != 200 or response.streaming:
+        return None
+    content = CSRF_TOKEN_RE.sub(
+        rf"\g<1>{CSRF_TOKEN_PLACEHOLDER}\g<2>",
+        response.content.decode(response.charset),
+    )
+    return content, response["Content-Type"]
+
+
+class PageCacheMixin(ConditionalGetMixin):
+    """
+    Cache the rendered page of a view for anonymous visitors, keyed on the
+    url and its query parameters. Cached pages are invalidated together with
+    the validators of ConditionalGetMixin, through the "pages" version.
+    """
+
+    page_cache_timeout = None
+
+    def get_page(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get_page(request, *args, **kwargs)
+
+        cache = caches[settings.PAGE_CACHE]
+        key = page_cache_key(request, get_version("pages"))
+        cached = cache.get(key)
+        if cached is not None:
+            self.view_skipped()
+            return cached_page_response(request, cached)
+
+        response = super().get_page(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        cached = cacheable_page(response)
+        if cached is not None:
+            cache.set(
+                key,
+                cached,
+                timeout=self.page_cache_timeout or settings.PAGE_CACHE_TIMEOUT,
+            )
+        return response
@@ -0,0 +1,160 @@
+import base64
+import json
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+# Keyset (cursor) pagination for the post listings. Instead of OFFSET and a
+# COUNT(*) for the page numbers, every page remembers the (published_at, id)
+# of its first and last post and the next query continues from there, so
+# page N costs as much as page 1.
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except ValueError:
+        raise InvalidCursor("That cursor is not valid")
+
+
+class CursorPage:
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate posts newest first by (published_at, id). The queryset must not
+    contain posts without published_at.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    def _cursor(self, direction, post):
+        return encode_cursor([direction, post.published_at.isoformat(), post.pk])
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        direction = "next"
+        if cursor:
+            try:
+                direction, published_at, pk = decode_cursor(cursor)
+                published_at = parse_datetime(published_at)
+                pk = int(pk)
+            except (TypeError, ValueError):
+                raise InvalidCursor("That cursor is not valid")
+            if direction not in ("next", "previous") or published_at is None:
+                raise InvalidCursor("That cursor is not valid")
+            if direction == "next":
+                queryset = queryset.filter(
+                    Q(published_at__lt=published_at)
+                    | Q(published_at=published_at, pk__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(published_at__gt=published_at)
+                    | Q(published_at=published_at, pk__gt=pk)
+                )
+
+        if direction == "next":
+            rows = list(queryset.order_by("-published_at", "-pk")[: self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            posts = rows[: self.per_page]
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            rows = list(queryset.order_by("published_at", "pk")[: self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            posts = rows[: self.per_page][::-1]
+            has_next, has_previous = True, has_more
+
+        return CursorPage(
+            posts,
+            next_cursor=self._cursor("next", posts[-1]) if has_next and posts else None,
+            previous_cursor=(
+                self._cursor("previous", posts[0]) if has_previous and posts else None
+            ),
+        )
+
+
+class OffsetCursorPaginator:
+    """
+    Cursor pagination for sequences without a stable sort key, like search
+    results ordered by relevance. Fetches one extra row instead of counting.
+    """
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def page(self, cursor=None):
+        offset = 0
+        if cursor:
+            try:
+                offset = int(decode_cursor(cursor))
+            except (TypeError, ValueError):
+                raise InvalidCursor("That cursor is not valid")
+            if offset < 0:
+                raise InvalidCursor("That cursor is not valid")
+        rows = list(self.object_list[offset : offset + self.per_page + 1])
+        previous_offset = max(offset - self.per_page, 0)
+        return CursorPage(
+            rows[: self.per_page],
+            next_cursor=(
+                encode_cursor(offset + self.per_page)
+                if len(rows) > self.per_page
+                else None
+            ),
+            previous_cursor=encode_cursor(previous_offset) if offset else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """Use KeysetPaginator in a ListView, the cursor comes from ?cursor=."""
+
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
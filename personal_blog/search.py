@@ -0,0 +1,244 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils.html import strip_tags
+
+from personal_blog.models import Post
+
+# Full text index of the published posts, kept in sync by
+# personal_blog/signals.py and rebuilt with `manage.py rebuild_search_index`.
+# SQLite uses an FTS5 virtual table, PostgreSQL a tsvector table with a GIN
+# index; any other database falls back to icontains filtering.
+TABLE_NAME = "personal_blog_post_search"
+
+
+def document(title, content):
+    return title, strip_tags(content)
+
+
+class SQLiteSearchBackend:
+    def install(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} "
+            "USING fts5(title, content, tokenize = 'porter unicode61')"
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+    def clear(self, cursor):
+        cursor.execute(f"DELETE FROM {TABLE_NAME}")
+
+    def remove(self, cursor, post_ids):
+        cursor.executemany(
+            f"DELETE FROM {TABLE_NAME} WHERE rowid = %s",
+            [(post_id,) for post_id in post_ids],
+        )
+
+    def add(self, cursor, rows):
+        # rows are (post_id, title, content) of published posts
+        cursor.executemany(
+            f"INSERT INTO {TABLE_NAME} (rowid, title, content) VALUES (%s, %s, %s)",
+            [(post_id, *document(title, content)) for post_id, title, content in rows],
+        )
+
+    def parse(self, query):
+        # quote every word so user input can't use the FTS5 query syntax,
+        # and match the last one as a prefix for search-as-you-type
+        words = re.findall(r"\w+", query)
+        if not words:
+            return None
+        terms = ['"%s"' % word for word in words]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def count(self, cursor, query):
+        cursor.execute(
+            f"SELECT count(*) FROM {TABLE_NAME} WHERE {TABLE_NAME} MATCH %s", [query]
+        )
+        return cursor.fetchone()[0]
+
+    def ranked_ids(self, cursor, query, offset, limit):
+        # title matches weigh more than content matches
+        cursor.execute(
+            f"SELECT rowid FROM {TABLE_NAME} WHERE {TABLE_NAME} MATCH %s "
+            f"ORDER BY bm25({TABLE_NAME}, 10.0, 1.0) LIMIT %s OFFSET %s",
+            [query, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend:
+    def install(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ("
+            "post_id bigint PRIMARY KEY "
+            "REFERENCES personal_blog_post (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TABLE_NAME}_document_idx "
+            f"ON {TABLE_NAME} USING gin (document)"
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+    def clear(self, cursor):
+        cursor.execute(f"TRUNCATE {TABLE_NAME}")
+
+    def remove(self, cursor, post_ids):
+        cursor.execute(
+            f"DELETE FROM {TABLE_NAME} WHERE post_id = ANY(%s)", [list(post_ids)]
+        )
+
+    def add(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT INTO {TABLE_NAME} (post_id, document) VALUES (%s, "
+            "setweight(to_tsvector('english', %s), 'A') || "
+            "setweight(to_tsvector('english', %s), 'B'))",
+            [(post_id, *document(title, content)) for post_id, title, content in rows],
+        )
+
+    def parse(self, query):
+        return query.strip() or None
+
+    def count(self, cursor, query):
+        cursor.execute(
+            f"SELECT count(*) FROM {TABLE_NAME} "
+            "WHERE document @@ websearch_to_tsquery('english', %s)",
+            [query],
+        )
+        return cursor.fetchone()[0]
+
+    def ranked_ids(self, cursor, query, offset, limit):
+        cursor.execute(
+            f"SELECT post_id FROM {TABLE_NAME}, "
+            "websearch_to_tsquery('english', %s) query "
+            "WHERE document @@ query "
+            "ORDER BY ts_rank(document, query) DESC, post_id DESC "
+            "LIMIT %s OFFSET %s",
+            [query, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_backend(conn=connection):
+    backend = BACKENDS.get(conn.vendor)
+    return backend() if backend else None
+
+
+class SearchResults:
+    """
+    Relevance ranked posts matching a query. Supports len() and slicing so it
+    can be handed to a Paginator; every slice costs one index lookup plus
+    one query for the posts on that page.
+    """
+
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+
+    def count(self):
+        if not hasattr(self, "_count"):
+            with connection.cursor() as cursor:
+                self._count = self.backend.count(cursor, self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, k):
+        if not isinstance(k, slice):
+            return self[k : k + 1][0]
+        offset = k.start or 0
+        limit = (k.stop if k.stop is not None else self.count()) - offset
+        if limit <= 0:
+            return []
+        with connection.cursor() as cursor:
+            post_ids = self.backend.ranked_ids(cursor, self.query, offset, limit)
+        posts = Post.objects.for_listing().in_bulk(post_ids)
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+def icontains_posts(query):
+    """The published posts containing `query`, without the index."""
+    return (
+        Post.objects.filter(
+            (Q(title__icontains=query) | Q(content__icontains=query))
+            & Q(status="published", published_at__isnull=False)
+        )
+        .for_listing()
+        .order_by("-published_at")
+    )
+
+
+def search_posts(query):
+    backend = get_backend()
+    if backend is None:
+        return icontains_posts(query)
+    parsed_query = backend.parse(query)
+    if parsed_query is None:
+        return Post.objects.none()
+    return SearchResults(backend, parsed_query)
+
+
+def index_posts(posts):
+    """Add or refresh `posts` in the index; unpublished posts are removed."""
+    backend = get_backend()
+    if backend is None:
+        return
+    posts = list(posts)
+    with connection.cursor() as cursor:
+        backend.remove(cursor, [post.pk for post in posts])
+        backend.add(
+            cursor,
+            [
+                (post.pk, post.title, post.content)
+                for post in posts
+                if post.status == "published"
+            ],
+        )
+
+
+def remove_posts(post_ids):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, post_ids)
+
+
+def rebuild_index(queryset, batch_size=500):
+    """Re-index every published post of `queryset` from scratch."""
+    conn = connections[queryset.db]
+    backend = get_backend(conn)
+    if backend is None:
+        return 0
+    rows = (
+        queryset.filter(status="published")
+        .values_list("pk", "title", "content")
+        .iterator(chunk_size=batch_size)
+    )
+    indexed = 0
+    with conn.cursor() as cursor:
+        backend.clear(cursor)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                backend.add(cursor, batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            backend.add(cursor, batch)
+            indexed += len(batch)
+    return indexed
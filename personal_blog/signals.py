@@ -0,0 +1,82 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from personal_blog import images, search
+from personal_blog.cache_versions import bump_version
+from personal_blog.models import Category, Comment, Post, Tag
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_navigation(sender, **kwargs):
+    bump_version("navigation")
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.tag.through)
+def invalidate_pages(sender, **kwargs):
+    bump_version("pages")
+
+
+@receiver(pre_save, sender=Post)
+def remember_category(sender, instance, **kwargs):
+    # for recount_category_views when the post moves to another category
+    instance._previous_category_id = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("category_id", flat=True)
+        .first()
+        if instance.pk is not None
+        else None
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def recount_category_views(sender, instance, **kwargs):
+    # publishing, unpublishing, moving or deleting a post changes the totals
+    category_ids = {
+        instance.category_id,
+        getattr(instance, "_previous_category_id", None),
+    }
+    Category.objects.filter(pk__in=category_ids - {None}).refresh_total_views()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    search.index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def generate_post_image_renditions(sender, instance, **kwargs):
+    images.ensure_renditions(instance.featured_image)
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_metadata(sender, instance, **kwargs):
+    # a replaced featured_image is measured again by extract_image_metadata
+    if instance.pk is None or instance.image_size is None:
+        return
+    old_name = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("featured_image", flat=True)
+        .first()
+    )
+    if old_name != instance.featured_image.name:
+        instance.image_width = instance.image_height = instance.image_size = None
+        instance.image_color = ""
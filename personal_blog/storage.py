@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from personal_blog.assets import build_bundle, compressed_siblings
+
+
+class BundledStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also builds the settings.ASSET_BUNDLES
+    and writes .gz (and .br, when brotli is installed) siblings of the
+    hashed files, for the web server to send as they are.
+    """
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert(matchobj):
+            # the theme stylesheets refer to a few images it does not ship,
+            # leave those urls alone rather than failing the whole build
+            try:
+                return converter(matchobj)
+            except ValueError:
+                return matchobj["matched"]
+
+        return convert
+
+    def build_bundles(self, paths):
+        def read(path):
+            storage, source = paths[path]
+            with storage.open(source) as f:
+                return f.read().decode()
+
+        for name in settings.ASSET_BUNDLES:
+            if self.exists(name):
+                self.delete(name)
+            self.save(name, ContentFile(build_bundle(name, read).encode()))
+            paths[name] = (self, name)
+
+    def compress(self, name):
+        with self.open(name) as f:
+            data = f.read()
+        for sibling, content in compressed_siblings(name, data):
+            if self.exists(sibling):
+                self.delete(sibling)
+            self.save(sibling, ContentFile(content))
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        paths = dict(paths)
+        self.build_bundles(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        for name in set(self.hashed_files.values()):
+            self.compress(name)
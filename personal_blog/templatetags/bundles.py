@@ -0,0 +1,31 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from personal_blog.assets import bundle_sources
+
+register = template.Library()
+
+TAGS = {
+    ".css": '<link rel="stylesheet" href="{}">\n',
+    ".js": '<script src="{}"></script>\n',
+}
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    Link the settings.ASSET_BUNDLES bundle `name`, built by
+    `manage.py build_assets`. With DEBUG on its sources are linked one by
+    one instead, so they can be edited without a rebuild.
+
+        {% bundle "aznews/assets/css/aznews.bundle.css" %}
+    """
+    tag = TAGS[name[name.rindex(".") :]]
+    urls = (
+        [static(source) for source in bundle_sources(name)]
+        if settings.DEBUG
+        else [static(name)]
+    )
+    return format_html_join("", tag, ((url,) for url in urls))
@@ -0,0 +1,61 @@
+from django import template
+from django.utils.html import format_html
+
+from personal_blog.images import RENDITIONS, ensure_renditions, rendition_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_image(image, rendition="card", alt="", css_class="", width=None):
+    """
+    Render an ImageField file as a <picture> with WebP and JPEG srcsets of
+    the renditions up to twice the `rendition` width (for high density
+    screens), falling back to the original when it can't be resized.
+
+        {% post_image post.featured_image "thumbnail" alt=post.title %}
+    """
+    if not image:
+        return ""
+    widths = ensure_renditions(image)
+    if not widths:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}"{}>',
+            image.url,
+            alt,
+            css_class,
+            format_html(' width="{}"', width) if width else "",
+        )
+
+    slot_width = RENDITIONS[rendition]
+    # the renditions of a narrow original are copies of it at its own width,
+    # only the first of those is listed
+    candidates = []
+    for name, max_width in RENDITIONS.items():
+        if max_width > slot_width * 2:
+            break
+        if candidates and candidates[-1][1] >= widths["original"]:
+            break
+        candidates.append((name, widths[name]))
+    sizes = f"(max-width: {slot_width}px) 100vw, {slot_width}px"
+
+    def srcset(ext):
+        return ", ".join(
+            f"{rendition_url(image, name, ext)} {rendition_width}w"
+            for name, rendition_width in candidates
+        )
+
+    return format_html(
+        "<picture>"
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}"{} loading="lazy">'
+        "</picture>",
+        srcset("webp"),
+        sizes,
+        rendition_url(image, rendition),
+        srcset("jpg"),
+        sizes,
+        alt,
+        css_class,
+        format_html(' width="{}"', width) if width else "",
+    )
@@ -0,0 +1,17 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def url_replace(context, **kwargs):
+    """
+    The query string of the current request with the given parameters
+    replaced, so pagination links keep the search query and other filters.
+
+        <a href="?{% url_replace cursor=page_obj.next_cursor %}">
+    """
+    params = context["request"].GET.copy()
+    for name, value in kwargs.items():
+        params[name] = value
+    return params.urlencode()
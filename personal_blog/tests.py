@@ -1,3 +1,696 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import smtplib
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.forms import modelform_factory
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from personal_blog import file_server, newsletter, view_counter, views
+from personal_blog.management.commands import check_query_plans
+from personal_blog.models import (
+    Category,
+    Comment,
+    NewsLetter,
+    NewsletterIssue,
+    Post,
+    PostViewBucket,
+    Tag,
+)
+from personal_blog.navigation_context_processor import NAVIGATION, navigation
+from personal_blog.pagination import (
+    InvalidCursor,
+    KeysetPaginator,
+    OffsetCursorPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+from personal_blog.templatetags.post_images import post_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "view-counts": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "view-counts",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    },
+    # pages are rendered on every request instead of served from the page cache
+    "pages": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+def image():
+    data = io.BytesIO()
+    Image.new("RGB", (400, 300), (200, 30, 30)).save(data, "PNG")
+    return ContentFile(data.getvalue(), "post.png")
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    CACHES=TEST_CACHES,
+    PAGE_CACHE="pages",
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+    # the view counts are not flushed in the middle of a request
+    VIEW_COUNTER_FLUSH_INTERVAL=60 * 60,
+)
+class BlogTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("author", "author@example.com", "pw")
+        cls.category = Category.objects.create(name="news")
+        cls.tags = [Tag.objects.create(name=f"tag{i}") for i in range(4)]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        for cache in ("default", "view-counts", "shared"):
+            caches[cache].clear()
+        # not flushed at exit, once the test database is gone
+        self.addCleanup(view_counter._pending_ids.clear)
+
+    def create_post(self, title="hello world", comments=1, tags=1, **kwargs):
+        post = Post(
+            title=title,
+            category=self.category,
+            author=self.author,
+            content="<p>hello world</p>",
+            status="published",
+            published_at=timezone.now() - timedelta(minutes=Post.objects.count()),
+            **kwargs,
+        )
+        post.featured_image.save("post.png", image(), save=False)
+        post.save()
+        post.tag.set(self.tags[:tags])
+        for i in range(comments):
+            Comment.objects.create(
+                post=post,
+                description=f"comment {i}",
+                author_name="reader",
+                author_email="reader@example.com",
+            )
+        return post
+
+    def assertQueriesAtPageSizes(self, num, url, view, attribute="paginate_by"):
+        """The page takes `num` queries with 2 and with 5 posts per page."""
+        for page_size in (2, 5):
+            with self.subTest(page_size=page_size):
+                with mock.patch.object(view, attribute, page_size):
+                    # warm the navigation and rendition caches
+                    self.client.get(url)
+                    with self.assertNumQueries(num):
+                        response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context["page_obj"]), page_size)
+
+
+class ListingQueryCountTests(BlogTestCase):
+    """The listings take the same number of queries whatever the page size."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            self.create_post(comments=i % 3, tags=i % 4 + 1)
+
+    def test_post_list(self):
+        self.assertQueriesAtPageSizes(2, reverse("post-list"), views.PostListView)
+
+    def test_post_by_tag(self):
+        self.assertQueriesAtPageSizes(
+            2, reverse("post-by-tag", args=[self.tags[0].pk]), views.PostByTag
+        )
+
+    def test_post_by_category(self):
+        self.assertQueriesAtPageSizes(
+            2,
+            reverse("post-by-category", args=[self.category.pk]),
+            views.PostByCategory,
+        )
+
+    def test_post_search(self):
+        self.assertQueriesAtPageSizes(
+            3, reverse("post-search") + "?query=hello", views, "PAGINATE_BY"
+        )
+
+
+class HomePageQueryCountTests(BlogTestCase):
+    def test_home_page(self):
+        # the widgets show at most 7 posts, with 3 or 12 published
+        for count in (3, 9):
+            with self.subTest(posts=Post.objects.count() + count):
+                for _ in range(count):
+                    self.create_post()
+                caches["default"].clear()
+                with self.assertNumQueries(8):
+                    response = self.client.get(reverse("home"))
+                self.assertEqual(response.status_code, 200)
+
+    def test_warm_home_page(self):
+        for count in (3, 9):
+            with self.subTest(posts=Post.objects.count() + count):
+                for _ in range(count):
+                    self.create_post()
+                self.client.get(reverse("home"))
+                with self.assertNumQueries(0):
+                    response = self.client.get(reverse("home"))
+                self.assertEqual(response.status_code, 200)
+
+
+class DetailQueryCountTests(BlogTestCase):
+    def test_post_detail(self):
+        # the number of comments and tags of the post don't matter
+        for comments, tags in ((1, 1), (5, 4)):
+            with self.subTest(comments=comments, tags=tags):
+                post = self.create_post(comments=comments, tags=tags)
+                url = reverse("post-detail", args=[post.pk])
+                self.client.get(url)
+                with self.assertNumQueries(5):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+
+class NavigationCacheTests(BlogTestCase):
+    """The cached navigation values change as soon as what they show is saved."""
+
+    def navigation(self):
+        context = navigation(None)
+        return {name: list(context[name]) for name in NAVIGATION}
+
+    def test_cached(self):
+        self.create_post()
+        self.navigation()
+        with self.assertNumQueries(0):
+            self.navigation()
+
+    def test_saving_a_post(self):
+        post = self.create_post(title="before")
+        self.assertEqual(self.navigation()["recent_posts"][0].title, "before")
+        post.title = "after"
+        post.save()
+        self.assertEqual(self.navigation()["recent_posts"][0].title, "after")
+
+    def test_saving_a_category(self):
+        self.navigation()
+        self.category.name = "sports"
+        self.category.save()
+        self.assertEqual(
+            [category.name for category in self.navigation()["categories"]],
+            ["sports"],
+        )
+        category = Category.objects.create(name="travel")
+        self.assertIn(category, self.navigation()["categories"])
+
+    def test_saving_a_tag(self):
+        self.navigation()
+        self.tags[1].name = "renamed"
+        self.tags[1].save()
+        self.assertIn("renamed", [tag.name for tag in self.navigation()["tags"]])
+
+
+class PostImageTests(BlogTestCase):
+    def test_srcset_widths(self):
+        post = self.create_post()
+        html = post_image(post.featured_image, "hero")
+        # the 400px wide original isn't listed again as a 1200px rendition
+        self.assertIn("-thumbnail.webp 180w, ", html)
+        self.assertIn("-card.jpg 400w", html)
+        self.assertNotIn("-hero.jpg", html.split("srcset=")[-1])
+        self.assertNotIn("1200w", html)
+
+
+class ConditionalGetTests(BlogTestCase):
+    def get(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_page_not_modified(self):
+        post = self.create_post()
+        url = reverse("post-detail", args=[post.pk])
+        # the first response sets the CSRF cookie the page depends on
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(self.get(url, response).status_code, 304)
+        post.save()
+        self.assertEqual(self.get(url, response).status_code, 200)
+
+    def test_api_changes_with_the_view_counts(self):
+        post = self.create_post()
+        for url in ("/api/v1/posts/", "/api/v1/categories/"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(self.get(url, response).status_code, 304)
+                view_counter.record_view(post.pk)
+                view_counter.flush()
+                self.assertEqual(self.get(url, response).status_code, 200)
+
+
+class ViewCounterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        view_counter._pending_ids.clear()
+        self.posts = [self.create_post() for _ in range(3)]
+
+    def record(self, post, views):
+        for _ in range(views):
+            view_counter.record_view(post.pk)
+
+    def test_flush(self):
+        for post, views in zip(self.posts, (2, 2, 5)):
+            self.record(post, views)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(view_counter.flush(), 9)
+        # one UPDATE per distinct increment
+        post_updates = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "personal_blog_post"')
+        ]
+        self.assertEqual(len(post_updates), 2)
+
+        self.assertEqual(
+            [post.views_count for post in Post.objects.order_by("pk")], [2, 2, 5]
+        )
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.total_views, 9)
+        self.assertEqual(
+            dict(PostViewBucket.objects.values_list("post_id", "views")),
+            {self.posts[0].pk: 2, self.posts[1].pk: 2, self.posts[2].pk: 5},
+        )
+
+    def test_flush_again(self):
+        self.record(self.posts[0], 3)
+        view_counter.flush()
+        self.assertEqual(view_counter.flush(), 0)
+        self.record(self.posts[0], 1)
+        self.assertEqual(view_counter.flush(), 1)
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views_count, 4)
+        self.assertEqual(PostViewBucket.objects.get().views, 4)
+
+    def test_drafts_are_not_in_the_category_views(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(status="draft")
+        self.record(self.posts[0], 2)
+        self.record(self.posts[1], 1)
+        view_counter.flush()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.total_views, 1)
+
+    def test_locked(self):
+        self.record(self.posts[0], 2)
+        caches["view-counts"].add(view_counter.FLUSH_LOCK_KEY, 1)
+        # another process is flushing
+        self.assertEqual(view_counter.flush(), 0)
+        caches["view-counts"].delete(view_counter.FLUSH_LOCK_KEY)
+        self.assertEqual(view_counter.flush(), 2)
+
+    def test_failed_flush_keeps_the_counts(self):
+        self.record(self.posts[0], 2)
+        with mock.patch.object(
+            view_counter.trending, "add_views", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                view_counter.flush()
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views_count, 0)
+        self.assertEqual(view_counter.flush(), 2)
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views_count, 2)
+
+
+@override_settings(SERVE_FILES=True, STATIC_ROOT=os.path.join(MEDIA_ROOT, "static"))
+class FileServerTests(SimpleTestCase):
+    url = "/static/site.0123456789ab.css"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        root = os.path.join(MEDIA_ROOT, "static")
+        os.makedirs(root, exist_ok=True)
+        for name, data in (
+            ("site.0123456789ab.css", b"0123456789"),
+            ("site.0123456789ab.css.br", b"br"),
+            ("site.0123456789ab.css.gz", b"gzip"),
+        ):
+            with open(os.path.join(root, name), "wb") as f:
+                f.write(data)
+
+    def test_parse_range(self):
+        for header, expected in (
+            ("bytes=0-3", (0, 3)),
+            ("bytes=5-", (5, 9)),
+            ("bytes=-4", (6, 9)),
+            ("bytes=-20", (0, 9)),
+            ("bytes=2-100", (2, 9)),
+            ("bytes=10-", "unsatisfiable"),
+            ("bytes=-0", "unsatisfiable"),
+            # sent in full
+            ("bytes=5-2", None),
+            ("bytes=0-1,4-5", None),
+            ("items=0-1", None),
+            ("bytes=-", None),
+            (None, None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(file_server.parse_range(header, 10), expected)
+
+    def test_encoding(self):
+        for header, encoding in (
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0, gzip", "gzip"),
+            ("gzip;q=0.5, br;q=0.4", "gzip"),
+            ("GZIP;Q=0.2", "gzip"),
+            ("*", "br"),
+            ("*, br;q=0", "gzip"),
+            ("br;q=0, gzip;q=0", None),
+            ("br;q=2, gzip;q=x", None),
+            ("identity", None),
+            ("", None),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_range(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=2-4", HTTP_ACCEPT_ENCODING="br"
+        )
+        self.assertEqual(response.status_code, 206)
+        # ranges are of the uncompressed file
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+
+    def test_range_not_satisfiable(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_if_range(self):
+        etag = self.client.get(self.url)["ETag"]
+        for if_range, status in ((etag, 206), ('"other"', 200)):
+            with self.subTest(if_range=if_range):
+                response = self.client.get(
+                    self.url, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=if_range
+                )
+                self.assertEqual(response.status_code, status)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["Cache-Control"], file_server.IMMUTABLE)
+        for headers in (
+            {"HTTP_IF_NONE_MATCH": response["ETag"]},
+            {"HTTP_IF_MODIFIED_SINCE": response["Last-Modified"]},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(self.url, **headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+
+class NewsletterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = self.create_post(title="fresh news")
+        self.emails = [f"reader{i}@example.com" for i in range(5)]
+        for email in self.emails:
+            NewsLetter.objects.create(email=email)
+        self.issue = newsletter.next_issue(subject="Weekly")
+        # the outbox of the locmem backend, whose open() and close() are no-ops
+        self.open = mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open", autospec=True
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def send(self, **kwargs):
+        return newsletter.send_issue(self.issue, batch_size=2, rate=0, **kwargs)
+
+    def test_send(self):
+        self.assertEqual(self.send(), 5)
+        # one connection for every batch
+        self.assertEqual(self.open.call_count, 1)
+        self.assertEqual(
+            [message.to for message in mail.outbox], [[e] for e in self.emails]
+        )
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, "Weekly")
+        self.assertIn("fresh news", message.body)
+        self.assertIn("fresh news", message.alternatives[0][0])
+
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.status, "sent")
+        self.assertEqual(self.issue.sent_count, 5)
+        self.assertEqual(self.issue.last_email, self.emails[-1])
+        self.assertIsNotNone(self.issue.finished_at)
+        # nothing new to send
+        self.assertIsNone(newsletter.next_issue())
+
+    def send_failing(self, email, error):
+        """send() with `error` raised when sending to `email`."""
+        send_messages = mail.get_connection().send_messages
+
+        def fail(messages):
+            if messages[0].to == [email]:
+                raise error
+            return send_messages(messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=fail,
+        ):
+            return self.send()
+
+    def test_resume(self):
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            self.send_failing(self.emails[3], smtplib.SMTPServerDisconnected())
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.status, "sending")
+        self.assertEqual(self.issue.sent_count, 3)
+        self.assertEqual(self.issue.last_email, self.emails[2])
+
+        mail.outbox.clear()
+        self.assertEqual(newsletter.next_issue(), self.issue)
+        self.assertEqual(self.send(), 2)
+        self.assertEqual(
+            [message.to for message in mail.outbox], [[e] for e in self.emails[3:]]
+        )
+        self.issue.refresh_from_db()
+        self.assertEqual((self.issue.status, self.issue.sent_count), ("sent", 5))
+
+    def test_refused(self):
+        error = smtplib.SMTPRecipientsRefused({self.emails[1]: (550, b"unknown")})
+        self.assertEqual(self.send_failing(self.emails[1], error), 4)
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.failed_emails, [self.emails[1]])
+        self.assertEqual((self.issue.status, self.issue.sent_count), ("sent", 4))
+        self.assertEqual(len(mail.outbox), 4)
+
+
+class PaginationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        # newest first
+        self.posts = [self.create_post(title=f"post {i}") for i in range(5)]
+
+    def walk(self, paginator):
+        """The pages to the end, then back from the last page to the first."""
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        forward = [list(page) for page in pages]
+        self.assertFalse(pages[0].has_previous())
+        backward = [forward[-1]]
+        page = pages[-1]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.insert(0, list(page))
+        return forward, backward
+
+    def test_cursor_encoding(self):
+        for data in (["next", "2022-09-01T10:00:00+00:00", 7], 40, "é"):
+            with self.subTest(data=data):
+                cursor = encode_cursor(data)
+                self.assertNotIn("=", cursor)
+                self.assertRegex(cursor, r"^[\w-]+$")
+                self.assertEqual(decode_cursor(cursor), data)
+
+    def test_keyset_walk(self):
+        forward, backward = self.walk(KeysetPaginator(Post.objects.all(), 2))
+        expected = [self.posts[0:2], self.posts[2:4], self.posts[4:]]
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def test_keyset_ties(self):
+        # the posts published at the same time are ordered by id
+        Post.objects.update(published_at=timezone.now())
+        forward, backward = self.walk(KeysetPaginator(Post.objects.all(), 2))
+        posts = sorted(self.posts, key=lambda post: -post.pk)
+        expected = [posts[0:2], posts[2:4], posts[4:]]
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def test_offset_walk(self):
+        forward, backward = self.walk(OffsetCursorPaginator(self.posts, 2))
+        expected = [self.posts[0:2], self.posts[2:4], self.posts[4:]]
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def test_invalid_cursor(self):
+        cursors = [
+            "%%%",
+            "bm90IGpzb24",  # "not json"
+            encode_cursor(["sideways", "2022-09-01T10:00:00", 1]),
+            encode_cursor(["next", "yesterday", 1]),
+            encode_cursor(["next", "2022-09-01T10:00:00", "one"]),
+            encode_cursor(["next", 5, 1]),
+            encode_cursor({"next": 1}),
+            encode_cursor(-2),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    KeysetPaginator(Post.objects.all(), 2).page(cursor)
+                with self.assertRaises(InvalidCursor):
+                    OffsetCursorPaginator(self.posts, 2).page(cursor)
+                for url, params in (
+                    (reverse("post-list"), {}),
+                    (reverse("post-by-category", args=[self.category.pk]), {}),
+                    (reverse("post-search"), {"query": "post"}),
+                ):
+                    response = self.client.get(url, {**params, "cursor": cursor})
+                    self.assertEqual(response.status_code, 404)
+
+
+class SubscriberTests(BlogTestCase):
+    def emails(self):
+        return list(NewsLetter.objects.order_by("pk").values_list("email", flat=True))
+
+    def test_normalized(self):
+        NewsLetter.objects.create(email="  Reader@Example.COM ")
+        self.assertEqual(self.emails(), ["reader@example.com"])
+
+        # the admin form
+        form = modelform_factory(NewsLetter, fields="__all__")(
+            {"email": "READER@example.com"}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("already exists", str(form.errors["email"]))
+        form = modelform_factory(NewsLetter, fields="__all__")(
+            {"email": "Other@Example.com"}
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(self.emails(), ["reader@example.com", "other@example.com"])
+
+    def test_subscribe(self):
+        _, created = NewsLetter.objects.subscribe("Reader@Example.com")
+        self.assertTrue(created)
+        subscriber, created = NewsLetter.objects.subscribe(" reader@example.com")
+        self.assertFalse(created)
+        self.assertEqual(subscriber.email, "reader@example.com")
+
+        for email in ("READER@example.com", "new@example.com"):
+            response = self.client.post(
+                reverse("newsletter"),
+                {"email": email},
+                HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+            )
+            self.assertEqual(response.json(), {"success": True})
+        self.assertEqual(self.emails(), ["reader@example.com", "new@example.com"])
+
+    def test_import(self):
+        NewsLetter.objects.create(email="old@example.com")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(
+                "name,email\n"
+                "a,Old@Example.com\n"
+                "b,new@example.com\n"
+                "c, NEW@example.com\n"
+                "d,not an email\n"
+                "e,other@example.com\n"
+            )
+        self.addCleanup(os.unlink, f.name)
+        output = io.StringIO()
+        for _ in range(2):
+            call_command("import_newsletters", f.name, batch_size=2, stdout=output)
+        self.assertEqual(
+            self.emails(), ["old@example.com", "new@example.com", "other@example.com"]
+        )
+        lines = output.getvalue().splitlines()
+        self.assertIn("5 emails: 2 subscribed, 1 invalid, 2 already", lines[0])
+        self.assertIn("5 emails: 0 subscribed, 1 invalid, 4 already", lines[1])
+
+    def test_merge_duplicates(self):
+        # saved as before the emails were normalized
+        NewsLetter.objects.bulk_create(
+            NewsLetter(email=email)
+            for email in (
+                "Reader@example.com",
+                "other@example.com",
+                "reader@example.com",
+                " READER@example.com",
+                "New@Example.com",
+            )
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(NewsLetter.objects.merge_duplicates(), (2, 2))
+        self.assertEqual(
+            self.emails(),
+            ["reader@example.com", "other@example.com", "new@example.com"],
+        )
+        # MySQL refuses a DELETE with a subquery of the same table
+        deletes = [q["sql"] for q in queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+        self.assertNotIn("SELECT", deletes[0])
+
+        self.assertEqual(NewsLetter.objects.merge_duplicates(), (0, 0))
+
+
+class QueryPlanTests(BlogTestCase):
+    """What `manage.py check_query_plans` checks, on the test database."""
+
+    def test_no_full_scan_of_the_posts(self):
+        if connection.vendor not in check_query_plans.FULL_SCAN_PATTERNS:
+            self.skipTest(f"query plans of {connection.vendor} are not supported")
+        for i in range(3):
+            self.create_post(title=f"hello {i}", comments=2, tags=2)
+        full_scan = check_query_plans.full_scan_pattern([Post._meta.db_table])
+        # nothing is served from a cache, so every query a page can run is seen
+        caches = {**TEST_CACHES, "default": check_query_plans.DUMMY_CACHE}
+        with override_settings(CACHES=caches):
+            for url in check_query_plans.page_urls():
+                with self.subTest(url=url):
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    for query in queries.captured_queries:
+                        sql = query["sql"]
+                        if not sql.lstrip().upper().startswith("SELECT"):
+                            continue
+                        plan = check_query_plans.explain(sql)
+                        self.assertFalse(
+                            [line for line in plan if full_scan.search(line.strip())],
+                            "\n".join([sql, *plan]),
+                        )
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from personal_blog.models import Post, PostViewBucket
+
+# Trending posts are ranked by the views they got in a recent window, summed
+# from the hourly PostViewBucket rows (see view_counter.flush).
+WINDOWS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+}
+
+
+def current_hour(now=None):
+    return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def add_views(counts, now=None):
+    """Add the {post_id: views} counts to the buckets of the current hour."""
+    hour = current_hour(now)
+    buckets = PostViewBucket.objects.filter(hour=hour)
+    existing = set(buckets.filter(post__in=counts).values_list("post_id", flat=True))
+    increments = {}
+    for post_id, count in counts.items():
+        if post_id in existing:
+            increments.setdefault(count, []).append(post_id)
+    for increment, ids in increments.items():
+        buckets.filter(post__in=ids).update(views=F("views") + increment)
+    PostViewBucket.objects.bulk_create(
+        PostViewBucket(post_id=post_id, hour=hour, views=count)
+        for post_id, count in counts.items()
+        if post_id not in existing
+    )
+
+
+def top_posts(window="week", limit=7):
+    """The published posts with the most views in the `window`."""
+    since = current_hour() - WINDOWS[window] + timedelta(hours=1)
+    totals = (
+        PostViewBucket.objects.filter(hour__gte=since, post__status="published")
+        .values("post")
+        .annotate(total=Sum("views"))
+        .order_by("-total", "post")[:limit]
+    )
+    post_ids = [row["post"] for row in totals]
+    posts = Post.objects.select_related("category").in_bulk(post_ids)
+    return [posts[pk] for pk in post_ids if pk in posts]
+
+
+def prune(keep=WINDOWS["week"], batch_size=5000):
+    """Delete the buckets older than the longest window, in batches."""
+    before = current_hour() - keep
+    deleted = 0
+    while True:
+        ids = list(
+            PostViewBucket.objects.filter(hour__lt=before).values_list("pk", flat=True)[
+                :batch_size
+            ]
+        )
+        if not ids:
+            return deleted
+        deleted += PostViewBucket.objects.filter(pk__in=ids).delete()[0]
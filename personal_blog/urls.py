@@ -1,20 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from personal_blog import views
 
+if settings.ASYNC_VIEWS:
+    from personal_blog import async_views as read_views
+else:
+    read_views = views
+
 urlpatterns = [
     path(
         "",
-        views.HomePageView.as_view(),
+        read_views.HomePageView.as_view(),
         name="home",
     ),
     path(
         "post-detail/<int:pk>/",
-        views.PostDetailView.as_view(),
+        read_views.PostDetailView.as_view(),
         name="post-detail",
     ),
     path(
         "post-list/",
-        views.PostListView.as_view(),
+        read_views.PostListView.as_view(),
         name="post-list",
     ),
     path(
@@ -44,12 +50,12 @@ urlpatterns = [
     ),
     path(
         "post-by-tag/<int:tag_id>/",
-        views.PostByTag.as_view(),
+        read_views.PostByTag.as_view(),
         name="post-by-tag",
     ),
     path(
         "post-by-category/<int:cat_id>/",
-        views.PostByCategory.as_view(),
+        read_views.PostByCategory.as_view(),
         name="post-by-category",
     ),
     path(
@@ -64,7 +70,7 @@ urlpatterns = [
     ),
     path(
         "post-search/",
-        views.PostSearchView.as_view(),
+        read_views.PostSearchView.as_view(),
         name="post-search",
     ),
     path(
@@ -0,0 +1,150 @@
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from personal_blog import trending
+from personal_blog.cache_versions import bump_version
+from personal_blog.models import Category, Post
+
+# Post views are counted in the cache and written to the database in batches.
+# Every worker process keeps its own counters in the local-memory
+# VIEW_COUNTER_CACHE and flushes them every VIEW_COUNTER_FLUSH_INTERVAL
+# seconds and when it exits. Only this process can flush its counts, which is
+# why there is no command to force a flush. The cache must have an atomic
+# incr() (local memory, redis, memcached) or concurrent views are lost.
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "post-views"
+FLUSH_LOCK_KEY = "post-views:flush-lock"
+FLUSH_LOCK_TIMEOUT = 60
+
+_lock = threading.Lock()
+_pending_ids = set()
+_last_flush = time.monotonic()
+
+
+def _cache():
+    return caches[getattr(settings, "VIEW_COUNTER_CACHE", "default")]
+
+
+def _flush_interval():
+    return getattr(settings, "VIEW_COUNTER_FLUSH_INTERVAL", 30)
+
+
+def _key(post_id):
+    return f"{KEY_PREFIX}:{post_id}"
+
+
+def record_view(post_id):
+    """Count one view of a post without touching the post row."""
+    cache = _cache()
+    key = _key(post_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # key does not exist yet (or was evicted)
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+    with _lock:
+        _pending_ids.add(post_id)
+        due = time.monotonic() - _last_flush >= _flush_interval()
+    if due:
+        # counting a view must never fail the page it is counted on
+        try:
+            flush()
+        except Exception:
+            logger.exception("Could not flush the post view counts")
+
+
+def flush(post_ids=None):
+    """
+    Write buffered views to the database with one UPDATE per distinct
+    increment. Returns the number of views written.
+    """
+    global _last_flush
+
+    with _lock:
+        if post_ids is None:
+            post_ids = set(_pending_ids)
+            _pending_ids.clear()
+        _last_flush = time.monotonic()
+    if not post_ids:
+        return 0
+
+    cache = _cache()
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=FLUSH_LOCK_TIMEOUT):
+        # another worker is flushing, try again on the next interval
+        with _lock:
+            _pending_ids.update(post_ids)
+        return 0
+
+    try:
+        keys = {_key(post_id): post_id for post_id in post_ids}
+        counts = {
+            keys[key]: count
+            for key, count in cache.get_many(keys).items()
+            if count and count > 0
+        }
+        if not counts:
+            return 0
+
+        try:
+            with transaction.atomic():
+                for increment, ids in _group_by_increment(counts).items():
+                    Post.objects.filter(pk__in=ids).update(
+                        views_count=F("views_count") + increment
+                    )
+                _add_category_views(counts)
+                trending.add_views(counts)
+        except Exception:
+            # the counts are still in the cache, flush them next time
+            with _lock:
+                _pending_ids.update(post_ids)
+            raise
+        # the API responses showing view counts
+        bump_version("views")
+
+        # decrement instead of delete so views recorded meanwhile are kept
+        for post_id, count in counts.items():
+            try:
+                cache.decr(_key(post_id), count)
+            except ValueError:
+                # evicted since get_many(), its count was just written
+                pass
+        return sum(counts.values())
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _group_by_increment(counts):
+    ids_by_increment = defaultdict(list)
+    for pk, count in counts.items():
+        ids_by_increment[count].append(pk)
+    return ids_by_increment
+
+
+def _add_category_views(counts):
+    """Keep Category.total_views in step with the posts' views_count."""
+    category_views = defaultdict(int)
+    published_posts = Post.objects.filter(
+        pk__in=counts, status="published", published_at__isnull=False
+    ).values_list("pk", "category_id")
+    for post_id, category_id in published_posts:
+        category_views[category_id] += counts[post_id]
+
+    for increment, ids in _group_by_increment(category_views).items():
+        Category.objects.filter(pk__in=ids).update(
+            total_views=F("total_views") + increment
+        )
+
+
+# gunicorn and runserver exit through sys.exit() on graceful shutdown
+atexit.register(flush)
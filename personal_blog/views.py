@@ -1,10 +1,7 @@
-from datetime import timedelta
-
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Q
-from django.http import JsonResponse
+from django.db.models import QuerySet
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
@@ -25,46 +22,44 @@ from personal_blog.forms import (
     PostForm,
     TagForm,
 )
-from personal_blog.models import Category, Post, Tag
-
-one_week_ago = timezone.now() - timedelta(days=7)
+from personal_blog import search, view_counter, widgets
+from personal_blog.conditional import ConditionalGetMixin
+from personal_blog.models import Category, NewsLetter, Post, Tag
+from personal_blog.page_cache import PageCacheMixin
+from personal_blog.pagination import (
+    InvalidCursor,
+    KeysetPaginationMixin,
+    KeysetPaginator,
+    OffsetCursorPaginator,
+)
 
 PAGINATE_BY = 1
 
 
-class HomePageView(ListView):
-    model = Post
+class HomePageView(PageCacheMixin, TemplateView):
     template_name = "aznews/index.html"
     # template_name = "blog/index.html"
-    context_object_name = "posts"
-    queryset = Post.objects.filter(status="published").order_by("-published_at")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["top_posts"] = Post.objects.filter(status="published").order_by(
-            "-views_count"
-        )[:3]
-        # getting most viewed single post
-        context["most_viewed"] = (
-            Post.objects.filter(status="published").order_by("-views_count").first()
-        )
-        # get all top post for this week
-        context["weekly_top_posts"] = Post.objects.filter(
-            status="published", published_at__gte=one_week_ago
-        ).order_by("-views_count")[:7]
-        context["top_categories"] = Category.objects.all()[:4]
+        # one cached snapshot of every widget, see personal_blog/widgets.py
+        context.update(widgets.home_widgets())
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(PageCacheMixin, DetailView):
     model = Post
     template_name = "aznews/main/blog/detail/post_detail.html"
     context_object_name = "post"
+    queryset = Post.objects.for_listing().with_comments()
+
+    def view_skipped(self):
+        view_counter.record_view(self.kwargs["pk"])
 
     def get_context_data(self, **kwargs):
-        obj = self.get_object()
-        obj.views_count += 1
-        obj.save()
+        obj = self.object
+        # buffered, written to the database in batches by view_counter.flush
+        view_counter.record_view(obj.pk)
 
         # getting next and previous posts
         context = super().get_context_data(**kwargs)
@@ -82,21 +77,27 @@ class PostDetailView(DetailView):
         return context
 
 
-class PostListView(ListView):
+class PostListView(PageCacheMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = "aznews/main/blog/post_list.html"
     context_object_name = "posts"
-    queryset = Post.objects.filter(
-        status="published", published_at__isnull=False
-    ).order_by("-published_at")
+    queryset = (
+        Post.objects.filter(status="published", published_at__isnull=False)
+        .for_listing()
+        .order_by("-published_at")
+    )
     paginate_by = 1
 
 
-class DraftListView(LoginRequiredMixin, ListView):
+class DraftListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Post
     template_name = "aznews/main/blog/post_list.html"
     context_object_name = "posts"
-    queryset = Post.objects.filter(published_at__isnull=True)
+    queryset = (
+        Post.objects.filter(published_at__isnull=True)
+        .for_listing()
+        .order_by("-created_at")
+    )
     paginate_by = PAGINATE_BY
 
 
@@ -164,7 +165,7 @@ class PostPublishView(LoginRequiredMixin, View):
 #         )
 
 
-class PostByTag(ListView):
+class PostByTag(PageCacheMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = "aznews/main/blog/post_list.html"
     context_object_name = "posts"
@@ -172,9 +173,14 @@ class PostByTag(ListView):
 
     def get_queryset(self):
         super().get_queryset()
-        queryset = Post.objects.filter(
-            status="published",
-            tag=self.kwargs["tag_id"],
+        queryset = (
+            Post.objects.filter(
+                status="published",
+                published_at__isnull=False,
+                tag=self.kwargs["tag_id"],
+            )
+            .for_listing()
+            .order_by("-published_at")
         )
         return queryset
 
@@ -191,7 +197,7 @@ class PostByTag(ListView):
 #         )
 
 
-class PostByCategory(ListView):
+class PostByCategory(PageCacheMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = "aznews/main/blog/post_list.html"
     context_object_name = "posts"
@@ -199,14 +205,19 @@ class PostByCategory(ListView):
 
     def get_queryset(self):
         super().get_queryset()
-        queryset = Post.objects.filter(
-            status="published",
-            category=self.kwargs["cat_id"],
-        ) # select * from post where status = 'published' and category = 1;
+        queryset = (
+            Post.objects.filter(
+                status="published",
+                published_at__isnull=False,
+                category=self.kwargs["cat_id"],
+            )  # select * from post where status = 'published' and category = 1;
+            .for_listing()
+            .order_by("-published_at")
+        )
         return queryset
 
 
-class ContactView(View):
+class ContactView(ConditionalGetMixin, View):
     template_name = "aznews/contact.html"
     form_class = ContactForm
 
@@ -236,12 +247,12 @@ class NewsLetterView(View):
         if is_ajax == "XMLHttpRequest":  # is this an ajax request ???
             form = self.form_class(request.POST)
             if form.is_valid():
-                form.save()
+                NewsLetter.objects.subscribe(form.cleaned_data["email"])
                 return JsonResponse({"success": True}, status=200)
         return JsonResponse({"success": False}, status=400)
 
 
-class PostSearchView(View):
+class PostSearchView(ConditionalGetMixin, View):
     template_name = "aznews/main/blog/post_search.html"
 
     # def get(self, request, *args, **kwargs):
@@ -253,21 +264,19 @@ class PostSearchView(View):
     #     )
 
     def get(self, request, *args, **kwargs):
-        print(request.GET)
-        query = request.GET["query"]
-        post_list = Post.objects.filter(
-            (Q(title__icontains=query) | Q(content__icontains=query))
-            & Q(status="published")
-        ).order_by("-published_at")
+        # a missing query finds nothing rather than failing
+        query = request.GET.get("query", "")
+        # relevance ranked, see personal_blog/search.py
+        post_list = search.search_posts(query)
         # pagination start
-        page = request.GET.get("page", 1)
-        paginator = Paginator(post_list, PAGINATE_BY)
+        if isinstance(post_list, QuerySet):
+            paginator = KeysetPaginator(post_list, PAGINATE_BY)
+        else:
+            paginator = OffsetCursorPaginator(post_list, PAGINATE_BY)
         try:
-            posts = paginator.page(page)
-        except PageNotAnInteger:
-            posts = paginator.page(1)
-        except EmptyPage:
-            posts = paginator.page(paginator.num_pages)
+            posts = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor as e:
+            raise Http404(str(e))
         # pagination end
         return render(
             request,
@@ -276,7 +285,7 @@ class PostSearchView(View):
         )
 
 
-class AboutView(TemplateView):
+class AboutView(PageCacheMixin, TemplateView):
     template_name = "aznews/about.html"
 
 
@@ -302,13 +311,13 @@ class CommentCreateView(View):
 
 
 #################### Category #########################
-class TagDetailView(DetailView):
+class TagDetailView(ConditionalGetMixin, DetailView):
     model = Tag
     template_name = "blog/tag_detail.html"
     context_object_name = "tag"
 
 
-class TagListView(LoginRequiredMixin, ListView):
+class TagListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Tag
     template_name = "blog/tag_list.html"
     context_object_name = "tags"
@@ -336,13 +345,13 @@ class TagUpdateView(LoginRequiredMixin, UpdateView):
 
 
 ####################### Category #######################
-class CategoryDetailView(DetailView):
+class CategoryDetailView(ConditionalGetMixin, DetailView):
     model = Category
     template_name = "blog/category_detail.html"
     context_object_name = "category"
 
 
-class CategoryListView(LoginRequiredMixin, ListView):
+class CategoryListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Category
     template_name = "blog/category_list.html"
     context_object_name = "categories"
@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.utils import timezone
+
+from personal_blog import trending
+from personal_blog.cache_versions import get_version
+from personal_blog.models import Category, Post
+
+
+def get_home_widgets():
+    """Everything the home page widgets render, evaluated."""
+    published_posts = Post.objects.filter(status="published").select_related("category")
+    by_views = published_posts.order_by("-views_count")
+    # latest 4 posts of every category for the "Whats New" tabs, in one query
+    latest_in_category = Subquery(
+        Post.objects.filter(category=OuterRef("category"), status="published")
+        .order_by("-published_at")
+        .values("pk")[:4]
+    )
+    categories = list(
+        Category.objects.prefetch_related(
+            Prefetch(
+                "post_set",
+                queryset=published_posts.filter(pk__in=latest_in_category).order_by(
+                    "-published_at"
+                ),
+            )
+        )
+    )
+    top_posts = list(by_views[:3])
+    # most viewed during the last 7 days, or right after deploying the view
+    # buckets, the most viewed of the posts published during them
+    weekly_top_posts = trending.top_posts("week", 7) or list(
+        by_views.filter(published_at__gte=timezone.now() - timedelta(days=7))[:7]
+    )
+    return {
+        # the "Whats New" section shows the first 4
+        "posts": list(published_posts.order_by("-published_at")[:4]),
+        "top_posts": top_posts,
+        "most_viewed": top_posts[0] if top_posts else None,
+        "weekly_top_posts": weekly_top_posts,
+        "top_categories": categories[:4],
+        "categories": categories,
+        # for the {% cache %} keys of the home page fragments
+        "widgets_version": time.time(),
+    }
+
+
+def home_widgets():
+    """
+    A snapshot of get_home_widgets(), rebuilt after a post, comment,
+    category or tag changes (the "pages" version) or, for the view counts,
+    after HOME_WIDGETS_TIMEOUT.
+    """
+    key = f"home-widgets:{get_version('pages')}"
+    widgets = cache.get(key)
+    if widgets is None:
+        widgets = get_home_widgets()
+        cache.set(key, widgets, settings.HOME_WIDGETS_TIMEOUT)
+    return widgets
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from report.models import ReportJob
+
+
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+
+
+admin.site.register(ReportJob, ReportJobAdmin)
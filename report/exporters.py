@@ -0,0 +1,71 @@
+import zlib
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from personal_blog.models import Comment, Contact, NewsLetter, Post
+
+# Bulk exports as NDJSON: one JSON object per line with every column of the
+# row, ordered by (updated_at, id). The updated_at of the last line is the
+# watermark to pass as `since` to the next incremental export.
+EXPORTS = {
+    "posts": Post,
+    "comments": Comment,
+    "newsletters": NewsLetter,
+    "contacts": Contact,
+}
+
+
+def parse_since(value):
+    """A datetime from "2022-12-31" or an ISO 8601 datetime."""
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError("since must be a date or an ISO 8601 datetime")
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_rows(name, since=None, chunk_size=2000):
+    """
+    The rows of the `name` export updated at or after `since`, read
+    `chunk_size` at a time. Rows updated exactly at the watermark are
+    exported again rather than missed.
+    """
+    try:
+        model = EXPORTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown export {name}, pick one of {', '.join(EXPORTS)}")
+    rows = model.objects.order_by("updated_at", "pk")
+    if since is not None:
+        rows = rows.filter(updated_at__gte=since)
+    fields = [field.attname for field in model._meta.concrete_fields]
+    return rows.values(*fields).iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(row) + "\n"
+
+
+def gzip_chunks(lines, buffer_size=64 * 1024):
+    """Gzip compress the lines as a stream, one chunk per `buffer_size`."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    buffer = []
+    buffered = 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= buffer_size:
+            chunk = compressor.compress(b"".join(buffer))
+            buffer, buffered = [], 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(b"".join(buffer)) + compressor.flush()
@@ -0,0 +1,134 @@
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Q
+from django.utils import timezone
+
+from report.models import ReportJob
+from report.renderers import REPORTS
+
+# Rendered reports are stored as REPORTS_ROOT/<kind>/<input hash>.pdf, so a
+# report is only rendered again when something it is rendered from changed.
+# A job that fails is tried again by the worker up to REPORT_JOB_MAX_ATTEMPTS
+# times, then stays failed, with its error, until it is explicitly retried.
+
+
+def artifact_path(kind, input_hash):
+    return os.path.join(settings.REPORTS_ROOT, kind, f"{input_hash}.pdf")
+
+
+def get_artifact_or_job(report):
+    """
+    Return (path, None) when the report is already rendered, otherwise
+    (None, job) with the job that is (or will be) rendering it, or that
+    failed to.
+    """
+    input_hash = report.input_hash()
+    path = artifact_path(report.kind, input_hash)
+    if os.path.exists(path):
+        return path, None
+
+    try:
+        job, _ = ReportJob.objects.get_or_create(
+            input_hash=input_hash,
+            defaults={"kind": report.kind, "params": report.params},
+        )
+    except IntegrityError:
+        # created by a concurrent request
+        job = ReportJob.objects.get(input_hash=input_hash)
+    if job.status == "done":
+        # the artifact was removed (see prune()), render it again
+        job.status = "pending"
+        job.started_at = None
+        job.attempts = 0
+        job.save(update_fields=["status", "started_at", "attempts", "updated_at"])
+    return None, job
+
+
+def retry_failed():
+    """Queue the failed jobs again, with all their attempts. Returns how many."""
+    return ReportJob.objects.filter(status="failed").update(
+        status="pending", started_at=None, attempts=0, updated_at=timezone.now()
+    )
+
+
+def claim_next_job():
+    """Atomically take the oldest pending job, or one whose worker died."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.REPORT_JOB_TIMEOUT)
+    died = Q(status="running", started_at__lt=stale)
+    ReportJob.objects.filter(
+        died, attempts__gte=settings.REPORT_JOB_MAX_ATTEMPTS
+    ).update(
+        status="failed",
+        error="The worker rendering the report stopped.",
+        finished_at=now,
+        updated_at=now,
+    )
+    candidates = ReportJob.objects.filter(Q(status="pending") | died).order_by(
+        "created_at"
+    )
+    for job in candidates[:10]:
+        claimed = ReportJob.objects.filter(
+            pk=job.pk, status=job.status, started_at=job.started_at
+        ).update(status="running", started_at=now, attempts=F("attempts") + 1)
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_job(job):
+    report = REPORTS[job.kind](job.params)
+    path = artifact_path(job.kind, job.input_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        # render next to the artifact and move it in place when complete
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path), suffix=".part", delete=False
+        ) as output:
+            try:
+                report.render(output)
+            except Exception:
+                os.unlink(output.name)
+                raise
+        os.replace(output.name, path)
+    except Exception as e:
+        # try again later, unless that was the last attempt
+        job.status = (
+            "failed" if job.attempts >= settings.REPORT_JOB_MAX_ATTEMPTS else "pending"
+        )
+        job.error = repr(e)
+    else:
+        job.status = "done"
+        job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+    return job
+
+
+def prune(keep):
+    """
+    Delete the rendered reports and the finished jobs older than `keep` (a
+    timedelta), and the leftovers of interrupted renders. A report still
+    asked for is rendered again. Returns (reports, jobs) deleted.
+    """
+    before = timezone.now() - keep
+    reports = 0
+    for directory, _, names in os.walk(settings.REPORTS_ROOT):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < before.timestamp():
+                    os.unlink(path)
+                    reports += name.endswith(".pdf")
+            except FileNotFoundError:
+                # deleted meanwhile
+                pass
+    jobs, _ = ReportJob.objects.filter(
+        status__in=("done", "failed"), finished_at__lt=before
+    ).delete()
+    return reports, jobs
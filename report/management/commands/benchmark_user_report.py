@@ -0,0 +1,78 @@
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+
+from report.views import COLUMNS, UserReportView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the peak memory allocated while the users CSV report is "
+        "streamed, at several numbers of users, next to loading the same rows "
+        "into a list. Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            nargs="+",
+            default=[1_000, 10_000, 100_000],
+            help="Numbers of users to measure with.",
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options):
+        self.stdout.write(
+            f"{'users':>8} {'csv bytes':>12} {'streamed peak':>14} {'list peak':>10}"
+        )
+        for count in sorted(options["users"]):
+            self.add_users(count - User.objects.count())
+            size, streamed = self.measure(self.stream_report)
+            _, listed = self.measure(
+                lambda: len(list(User.objects.values_list(*COLUMNS)))
+            )
+            self.stdout.write(
+                f"{count:>8} {size:>12} {streamed / 2**20:>11.2f} MB "
+                f"{listed / 2**20:>7.2f} MB"
+            )
+
+    def add_users(self, count, batch_size=5000):
+        offset = User.objects.count()
+        for start in range(0, count, batch_size):
+            User.objects.bulk_create(
+                User(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    first_name="Benchmark",
+                    last_name=f"User {i}",
+                    password="!",
+                )
+                for i in range(offset + start, offset + min(count, start + batch_size))
+            )
+
+    def stream_report(self):
+        request = RequestFactory().get("/reports/users/")
+        response = UserReportView.as_view()(request)
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def measure(self, run):
+        """The result of `run()` and the peak bytes allocated while it ran."""
+        tracemalloc.start()
+        try:
+            result = run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return result, peak
@@ -0,0 +1,73 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from report import exporters
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the rows of an export as NDJSON, ordered by updated_at. "
+        "Prints the watermark to pass as --since to the next run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=list(exporters.EXPORTS))
+        parser.add_argument(
+            "--since",
+            help="Only rows updated at or after this date or ISO 8601 datetime.",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to (default: standard output).",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Gzip compress the output.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of rows to read per query.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = options["since"] and exporters.parse_since(options["since"])
+        except ValueError as e:
+            raise CommandError(e)
+        rows = exporters.export_rows(
+            options["name"], since or None, chunk_size=options["chunk_size"]
+        )
+
+        exported = 0
+        watermark = None
+
+        def tracked(rows):
+            nonlocal exported, watermark
+            for row in rows:
+                exported += 1
+                watermark = row["updated_at"]
+                yield row
+
+        lines = exporters.ndjson_lines(tracked(rows))
+        if options["output"]:
+            output = open(options["output"], "wb")
+        else:
+            output = sys.stdout.buffer
+        try:
+            if options["gzip"]:
+                for chunk in exporters.gzip_chunks(lines):
+                    output.write(chunk)
+            else:
+                for line in lines:
+                    output.write(line.encode())
+        finally:
+            if options["output"]:
+                output.close()
+
+        self.stderr.write(f"Exported {exported} {options['name']}.")
+        if watermark is not None:
+            self.stderr.write(f"Next run: --since {watermark.isoformat()}")
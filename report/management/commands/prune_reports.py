@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from report import jobs
+
+
+class Command(BaseCommand):
+    help = "Delete the rendered reports and the finished report jobs that are old."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=settings.REPORT_RETENTION_DAYS,
+            help="Keep the reports and jobs of this many days "
+            "(default: settings.REPORT_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        reports, deleted_jobs = jobs.prune(keep=timedelta(days=options["keep_days"]))
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {reports} reports and {deleted_jobs} jobs.")
+        )
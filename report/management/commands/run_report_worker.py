@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from report import jobs
+
+
+class Command(BaseCommand):
+    help = "Render queued PDF reports."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of waiting for new jobs.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Queue the jobs that failed every attempt again first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["retry_failed"]:
+            self.stdout.write(f"Queued {jobs.retry_failed()} failed jobs again.")
+        while True:
+            job = jobs.claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+
+            started = time.monotonic()
+            job = jobs.run_job(job)
+            elapsed = time.monotonic() - started
+            if job.status == "done":
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Rendered {job.kind} #{job.pk} in {elapsed:.1f}s"
+                    )
+                )
+            else:
+                self.stderr.write(
+                    f"Failed {job.kind} #{job.pk} "
+                    f"(attempt {job.attempts}, {job.status}): {job.error}"
+                )
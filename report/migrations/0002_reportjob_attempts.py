@@ -0,0 +1,18 @@
+# Generated by Django 4.1.1 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("report", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportjob",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,3 +1,33 @@
 from django.db import models
 
-# Create your models here.
+from personal_blog.models import TimeStampModel
+
+
+class ReportJob(TimeStampModel):
+    """A report rendered out of band by `manage.py run_report_worker`."""
+
+    STATUS_CHOICES = [
+        ("pending", "pending"),
+        ("running", "running"),
+        ("done", "done"),
+        ("failed", "failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    # hash of everything the report is rendered from, also names the artifact
+    input_hash = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    # the error of the last attempt
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.kind} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="reportjob_status_idx"),
+        ]
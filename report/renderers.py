@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+from reportlab.lib.enums import TA_JUSTIFY
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from personal_blog.models import Category, Post, Tag
+
+
+class Report:
+    """
+    A PDF report. `get_inputs` must be cheap: it summarises everything the
+    report is rendered from, and its hash decides whether a rendered
+    artifact can be reused.
+    """
+
+    kind = None
+    # params that change how the report is fetched, not what it contains
+    unhashed_params = ("base_url",)
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    def get_inputs(self):
+        raise NotImplementedError
+
+    def get_filename(self):
+        raise NotImplementedError
+
+    def render(self, output):
+        """Write the PDF to the binary file object `output`."""
+        raise NotImplementedError
+
+    def input_hash(self):
+        params = {
+            key: value
+            for key, value in self.params.items()
+            if key not in self.unhashed_params
+        }
+        data = {"kind": self.kind, "params": params, "inputs": self.get_inputs()}
+        encoded = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class PostsReport(Report):
+    """
+    Posts rendered with WeasyPrint from reports/posts.html, optionally only
+    the ones published between the `published_after` and `published_before`
+    dates and/or of one `category`.
+
+    Every post is rendered to a PDF of its own, kept in REPORTS_ROOT until
+    the post, its category or its tags change, and the report is those PDFs
+    put one after the other. Rendering the report after an edit lays out
+    only the edited post; the others are copied. Each post starts a page.
+    """
+
+    kind = "posts"
+    chunk_size = 200
+
+    def get_queryset(self):
+        posts = Post.objects.order_by("pk")
+        if self.params.get("published_after"):
+            posts = posts.filter(published_at__date__gte=self.params["published_after"])
+        if self.params.get("published_before"):
+            posts = posts.filter(
+                published_at__date__lte=self.params["published_before"]
+            )
+        if self.params.get("category"):
+            posts = posts.filter(category=self.params["category"])
+        return posts
+
+    def get_inputs(self):
+        return {
+            "posts": self.get_queryset().aggregate(
+                count=Count("pk"), last_updated=Max("updated_at")
+            ),
+            "categories": Category.objects.aggregate(last_updated=Max("updated_at")),
+            "tags": Tag.objects.aggregate(last_updated=Max("updated_at")),
+        }
+
+    def get_filename(self):
+        return "posts.pdf"
+
+    def post_path(self, post, heading):
+        """Where the PDF of `post` is kept, named after what it shows."""
+        tags_updated = max((tag.updated_at for tag in post.tag.all()), default=None)
+        version = (post.updated_at, post.category.updated_at, tags_updated, heading)
+        digest = hashlib.sha256(
+            json.dumps(version, cls=DjangoJSONEncoder).encode()
+        ).hexdigest()
+        return os.path.join(
+            settings.REPORTS_ROOT, "posts-pages", f"{post.pk}-{digest}.pdf"
+        )
+
+    def render_document(self, output, posts=(), heading=True):
+        # imported here as only the report worker renders
+        from weasyprint import HTML
+
+        html_string = render_to_string(
+            "reports/posts.html",
+            {
+                "fragments": [
+                    render_to_string("reports/post.html", {"p": post}) for post in posts
+                ],
+                "heading": heading,
+            },
+        )
+        # base_url resolves the /media/ image urls of the posts
+        html = HTML(string=html_string, base_url=self.params.get("base_url"))
+        html.write_pdf(output)
+
+    def post_paths(self):
+        """The PDF of every post of the report, rendering the missing ones."""
+        posts = (
+            self.get_queryset()
+            .select_related("category")
+            .prefetch_related("tag")
+            .iterator(chunk_size=self.chunk_size)
+        )
+        for i, post in enumerate(posts):
+            # the first post's PDF starts with the title of the report
+            path = self.post_path(post, heading=i == 0)
+            if os.path.exists(path):
+                # still in use, see report.jobs.prune()
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(path), suffix=".part", delete=False
+                ) as output:
+                    try:
+                        self.render_document(output, [post], heading=i == 0)
+                    except Exception:
+                        os.unlink(output.name)
+                        raise
+                os.replace(output.name, path)
+            yield path
+
+    def render(self, output):
+        # imported here as only the report worker renders
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for path in self.post_paths():
+            writer.append(path)
+        if not writer.pages:
+            self.render_document(output)
+            return
+        writer.write(output)
+
+
+class LatestPostReport(Report):
+    """The latest published post rendered with ReportLab."""
+
+    kind = "latest-post"
+
+    def get_post(self):
+        return Post.objects.filter(status="published").order_by("-created_at").first()
+
+    def get_inputs(self):
+        post = self.get_post()
+        return {"post": post and (post.pk, post.updated_at)}
+
+    def get_filename(self):
+        post = self.get_post()
+        return f"{slugify(post.title)}.pdf" if post else "post.pdf"
+
+    def generate_styles(self):
+        styles = getSampleStyleSheet()
+
+        title = ParagraphStyle(
+            "post_title",
+            fontName="Helvetica-Bold",
+            fontSize=16,
+            parent=styles["Heading2"],
+            alignment=1,
+            spaceAfter=14,
+        )
+        content = ParagraphStyle(
+            name="Justify",
+            alignment=TA_JUSTIFY,
+        )
+        styles.add(content)
+        styles.add(title)
+        return styles
+
+    def render(self, output):
+        canvas = []
+        styles = self.generate_styles()
+
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=letter,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18,
+        )
+
+        post = self.get_post()
+
+        # post title
+        canvas.append(Paragraph(post.title, styles["post_title"]))
+        canvas.append(Spacer(1, 12))
+
+        # post content
+        content = strip_tags(post.content)
+        canvas.append(Paragraph(content, styles["Justify"]))
+        canvas.append(Spacer(1, 12))
+
+        doc.build(canvas)
+
+
+REPORTS = {report.kind: report for report in (PostsReport, LatestPostReport)}
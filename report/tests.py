@@ -1,3 +1,160 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+from personal_blog.models import Category, Post
+from report import jobs
+from report.models import ReportJob
+from report.renderers import PostsReport
+
+REPORTS_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(REPORTS_ROOT=REPORTS_ROOT, REPORT_JOB_MAX_ATTEMPTS=3)
+class ReportJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(REPORTS_ROOT, ignore_errors=True)
+
+    def run_worker(self):
+        while (job := jobs.claim_next_job()) is not None:
+            jobs.run_job(job)
+
+    def test_failed_report(self):
+        url = reverse("post-pdf-view")
+        self.assertEqual(self.client.get(url).status_code, 202)
+        with mock.patch.object(
+            PostsReport, "render", side_effect=RuntimeError("no fonts")
+        ) as render:
+            self.run_worker()
+        # tried again up to the limit, then left failed
+        self.assertEqual(render.call_count, 3)
+        job = ReportJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ("failed", 3))
+
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 500)
+            self.assertIn("no fonts", response.json()["error"])
+        self.assertIsNone(jobs.claim_next_job())
+        response = self.client.get(reverse("report-job", args=[job.pk]))
+        self.assertEqual(response.json()["status"], "failed")
+        self.assertIn("no fonts", response.json()["error"])
+
+        self.assertEqual(jobs.retry_failed(), 1)
+        with mock.patch.object(PostsReport, "render"):
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), ("done", 1, ""))
+
+    def test_dead_worker(self):
+        job = ReportJob.objects.create(
+            kind=PostsReport.kind,
+            input_hash="abc",
+            status="running",
+            attempts=3,
+            started_at=timezone.now() - timedelta(days=1),
+        )
+        self.assertIsNone(jobs.claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+
+    def test_prune(self):
+        long_ago = timezone.now() - timedelta(days=40)
+        old = ReportJob.objects.create(
+            kind="posts", input_hash="old", status="done", finished_at=long_ago
+        )
+        recent = ReportJob.objects.create(
+            kind="posts", input_hash="new", status="done", finished_at=timezone.now()
+        )
+        os.makedirs(os.path.join(REPORTS_ROOT, "posts"), exist_ok=True)
+        for job in (old, recent):
+            with open(jobs.artifact_path(job.kind, job.input_hash), "wb") as f:
+                f.write(b"%PDF")
+        old_time = time.time() - 40 * 24 * 60 * 60
+        os.utime(jobs.artifact_path("posts", "old"), (old_time, old_time))
+
+        self.assertEqual(jobs.prune(keep=timedelta(days=30)), (1, 1))
+        self.assertEqual(list(ReportJob.objects.all()), [recent])
+        self.assertFalse(os.path.exists(jobs.artifact_path("posts", "old")))
+        self.assertTrue(os.path.exists(jobs.artifact_path("posts", "new")))
+
+
+def render_document(report, output, posts=(), heading=True):
+    """One page per post, instead of laying them out with WeasyPrint."""
+    pdf = canvas.Canvas(output)
+    for post in posts or [None]:
+        pdf.drawString(100, 700, f"{'Posts ' if heading else ''}{post}")
+        pdf.showPage()
+    pdf.save()
+
+
+@override_settings(REPORTS_ROOT=REPORTS_ROOT)
+class PostsReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("author")
+        category = Category.objects.create(name="news")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Post {i}",
+                content="hello",
+                featured_image="post_images/post.png",
+                category=category,
+                author=author,
+                status="published",
+                published_at=timezone.now(),
+            )
+            for i in range(3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(REPORTS_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(REPORTS_ROOT, ignore_errors=True)
+
+    def render(self):
+        output = io.BytesIO()
+        with mock.patch.object(
+            PostsReport, "render_document", autospec=True, side_effect=render_document
+        ) as render:
+            PostsReport().render(output)
+        return len(PdfReader(output).pages), render
+
+    def test_only_changed_posts_are_rendered(self):
+        pages, render = self.render()
+        self.assertEqual((pages, render.call_count), (3, 3))
+        # the title of the report is on the first post's page only
+        self.assertEqual(
+            [call.kwargs["heading"] for call in render.call_args_list],
+            [True, False, False],
+        )
+
+        pages, render = self.render()
+        self.assertEqual((pages, render.call_count), (3, 0))
+
+        self.posts[1].title = "edited"
+        self.posts[1].save()
+        pages, render = self.render()
+        self.assertEqual((pages, render.call_count), (3, 1))
+        self.assertEqual(render.call_args.args[2], [self.posts[1]])
+
+    def test_no_posts(self):
+        Post.objects.all().delete()
+        pages, render = self.render()
+        self.assertEqual((pages, render.call_count), (1, 1))
@@ -7,6 +7,11 @@ urlpatterns = [
         views.UserReportView.as_view(),
         name="users",
     ),
+    path(
+        "exports/<str:name>/",
+        views.ExportView.as_view(),
+        name="export",
+    ),
     path(
         "pdf-file/post-download/",
         views.PDFFileDownloadView.as_view(),
@@ -17,4 +22,9 @@ urlpatterns = [
         views.PostPdfFileView.as_view(),
         name="post-pdf-view",
     ),
+    path(
+        "jobs/<int:pk>/",
+        views.ReportJobView.as_view(),
+        name="report-job",
+    ),
 ]
@@ -1,17 +1,24 @@
 import csv
-import io
 
 from django.contrib.auth import get_user_model
-from django.http import FileResponse, HttpResponse
-from django.utils.html import strip_tags
-from django.utils.text import slugify
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
 from django.views.generic import View
-from reportlab.lib.enums import TA_JUSTIFY
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 
 from personal_blog.models import Post
+from report import exporters, jobs
+from report.models import ReportJob
+from report.renderers import REPORTS, LatestPostReport, PostsReport
 
 User = get_user_model()
 
@@ -28,105 +35,212 @@ COLUMNS = [
 ]
 
 
-class UserReportView(View):
-    def get(self, request):
+class Echo:
+    """Hands back what csv.writer writes instead of buffering it."""
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = "attachment; filename=users.csv"
+    def write(self, value):
+        return value
 
-        users = User.objects.all().only(*COLUMNS).values(*COLUMNS)
-        print(users)
 
-        writer = csv.DictWriter(response, fieldnames=users[0].keys())
-        writer.writeheader()
-        writer.writerows(users)
+class UserReportView(View):
+    """
+    Stream the users as CSV, one row at a time, so memory use stays flat no
+    matter how many users there are.
+
+    ?columns=username,email picks the columns (default: all of COLUMNS),
+    ?is_staff=1, ?is_active=0, ?is_superuser=1, ?joined_after=2022-01-01 and
+    ?joined_before=2022-12-31 filter the rows.
+    """
+
+    chunk_size = 2000
+    boolean_filters = ("is_staff", "is_active", "is_superuser")
+
+    def get_columns(self):
+        columns = self.request.GET.get("columns")
+        if not columns:
+            return COLUMNS
+        columns = [column.strip() for column in columns.split(",")]
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        return columns
+
+    def get_queryset(self):
+        users = User.objects.order_by("pk")
+        for field in self.boolean_filters:
+            value = self.request.GET.get(field)
+            if value is not None:
+                users = users.filter(**{field: value.lower() in ("1", "true", "yes")})
+        for param, lookup in (
+            ("joined_after", "date_joined__date__gte"),
+            ("joined_before", "date_joined__date__lte"),
+        ):
+            value = self.request.GET.get(param)
+            if value:
+                joined = parse_date(value)
+                if joined is None:
+                    raise ValueError(f"{param} must be a date like 2022-12-31")
+                users = users.filter(**{lookup: joined})
+        return users
 
-        return response
+    def get(self, request):
+        try:
+            columns = self.get_columns()
+            users = self.get_queryset()
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
 
+        writer = csv.writer(Echo())
+        rows = users.values_list(*columns).iterator(chunk_size=self.chunk_size)
 
-class PDFFileDownloadView(View):
-    def generate_styles(self):
-        styles = getSampleStyleSheet()
+        def stream():
+            yield writer.writerow(columns)
+            for row in rows:
+                yield writer.writerow(row)
 
-        title = ParagraphStyle(
-            "post_title",
-            fontName="Helvetica-Bold",
-            fontSize=16,
-            parent=styles["Heading2"],
-            alignment=1,
-            spaceAfter=14,
-        )
-        content = ParagraphStyle(
-            name="Justify",
-            alignment=TA_JUSTIFY,
-        )
-        styles.add(content)
-        styles.add(title)
-        return styles
+        response = StreamingHttpResponse(stream(), content_type="text/csv")
+        response["Content-Disposition"] = "attachment; filename=users.csv"
+        return response
 
-    def get(self, request):
 
-        canvas = []
-        buffer = io.BytesIO()
-        styles = self.generate_styles()
-
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18,
-        )
-
-        post = Post.objects.filter(status="published").order_by("-created_at").first()
+class ExportView(UserPassesTestMixin, View):
+    """
+    Stream every row of an export (see report/exporters.py) as NDJSON, to
+    staff only. ?since=2022-12-31T00:00:00 limits it to the rows updated at
+    or after that watermark, ?gzip=1 compresses it.
+    """
+
+    chunk_size = 2000
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, name):
+        try:
+            since = request.GET.get("since")
+            since = exporters.parse_since(since) if since else None
+            rows = exporters.export_rows(name, since, chunk_size=self.chunk_size)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        lines = exporters.ndjson_lines(rows)
+        if request.GET.get("gzip", "").lower() in ("1", "true", "yes"):
+            response = StreamingHttpResponse(
+                exporters.gzip_chunks(lines), content_type="application/gzip"
+            )
+            filename = f"{name}.ndjson.gz"
+        else:
+            response = StreamingHttpResponse(
+                lines, content_type="application/x-ndjson; charset=utf-8"
+            )
+            filename = f"{name}.ndjson"
+        response["Content-Disposition"] = f"attachment; filename={filename}"
+        return response
 
-        # post title
-        canvas.append(Paragraph(post.title, styles["post_title"]))
-        canvas.append(Spacer(1, 12))
 
-        # post content
-        content = strip_tags(post.content)
-        canvas.append(Paragraph(content, styles["Justify"]))
-        canvas.append(Spacer(1, 12))
+class ReportFileMixin:
+    """
+    Serve a rendered report straight from disk, or queue it for
+    `manage.py run_report_worker` and answer 202 with a polling url.
+    """
 
-        doc.build(canvas)
+    report_class = None
+    as_attachment = True
 
-        buffer.seek(0)
+    def get_report_params(self):
+        return {"base_url": self.request.build_absolute_uri("/")}
 
+    def get(self, request, *args, **kwargs):
+        try:
+            report = self.report_class(self.get_report_params())
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        path, job = jobs.get_artifact_or_job(report)
+        if path is None and job.status == "failed":
+            return JsonResponse(
+                {
+                    "status": job.status,
+                    "error": job.error,
+                    "url": request.build_absolute_uri(
+                        reverse("report-job", args=[job.pk])
+                    ),
+                },
+                status=500,
+            )
+        if path is None:
+            return JsonResponse(
+                {
+                    "status": job.status,
+                    "url": request.build_absolute_uri(
+                        reverse("report-job", args=[job.pk])
+                    ),
+                },
+                status=202,
+            )
         return FileResponse(
-            buffer, as_attachment=True, filename=f"{slugify(post.title)}.pdf"
+            open(path, "rb"),
+            as_attachment=self.as_attachment,
+            filename=report.get_filename(),
+            content_type="application/pdf",
         )
 
 
-import tempfile
+class PDFFileDownloadView(ReportFileMixin, View):
+    report_class = LatestPostReport
 
-from django.http import HttpResponse
-from django.template.loader import render_to_string
-from weasyprint import HTML
-
-
-class PostPdfFileView(View):
     def get(self, request, *args, **kwargs):
-        # queryset
-        posts = Post.objects.all()  # SELECT * from personal_blog_post
-        print(posts.query)
-
-        # render
-        html_string = render_to_string("reports/posts.html", {"posts": posts})
-        html = HTML(string=html_string, base_url=request.build_absolute_uri())
-        result = html.write_pdf()
-
-        # http response
-        response = HttpResponse(content_type="application/pdf;")
-        response["Content-Disposition"] = "inline; filename=posts.pdf"
-        response["Content-Transfer-Encoding"] = "binary"
-
-        with tempfile.NamedTemporaryFile(delete=True) as output:
-            output.write(result)
-            output.flush()
-
-            with open(output.name, "rb") as f:
-                response.write(f.read())
-
-        return response
+        if not Post.objects.filter(status="published").exists():
+            raise Http404("There is no published post yet.")
+        return super().get(request, *args, **kwargs)
+
+
+class PostPdfFileView(ReportFileMixin, View):
+    """
+    ?published_after=2022-01-01, ?published_before=2022-12-31 and
+    ?category=<id> limit the report to a subset of the posts.
+    """
+
+    report_class = PostsReport
+    as_attachment = False
+
+    def get_report_params(self):
+        params = super().get_report_params()
+        for param in ("published_after", "published_before"):
+            value = self.request.GET.get(param)
+            if value:
+                if parse_date(value) is None:
+                    raise ValueError(f"{param} must be a date like 2022-12-31")
+                params[param] = value
+        category = self.request.GET.get("category")
+        if category:
+            if not category.isdigit():
+                raise ValueError("category must be a category id")
+            params["category"] = int(category)
+        return params
+
+
+class ReportJobView(View):
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(ReportJob, pk=pk)
+        data = {"status": job.status, "attempts": job.attempts}
+        if job.error:
+            # also of the last attempt of a job that will be tried again
+            data["error"] = job.error
+        if job.status == "done":
+            # the report views now answer from the rendered file
+            url = reverse(DOWNLOAD_URLS[job.kind])
+            query = {
+                key: value
+                for key, value in job.params.items()
+                if key not in REPORTS[job.kind].unhashed_params
+            }
+            if query:
+                url = f"{url}?{urlencode(query)}"
+            data["url"] = request.build_absolute_uri(url)
+        return JsonResponse(data)
+
+
+DOWNLOAD_URLS = {
+    LatestPostReport.kind: "post-pdf-download",
+    PostsReport.kind: "post-pdf-view",
+}